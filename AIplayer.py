@@ -1,70 +1,616 @@
-import copy
 import math
-from random import choice
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from Othello import Othello
+from TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+from MoveOrdering import MoveOrderer, ORDERING_STRATEGIES
+from SearchStats import SearchStats
+from EndgameSolver import EndgameSolver, SolverTimeout
+from OpeningBook import OpeningBook
+from PatternEval import PatternState, PatternWeights, pattern_codes
+
+MIN_NODE_KEY = 0x9E3779B97F4A7C15  # Mixed into table keys so max and min nodes never share entries
+TIME_CHECK_INTERVAL = 1024  # Nodes searched between clock checks
+
+
+class SearchTimeout(Exception):
+    """Raised inside minimax when the per-move time budget runs out."""
+
 
 class AIPlayer:
-    def __init__(self, depth, heuristic):
-        """Initialize the AI with a specific depth and heuristic."""
+    def __init__(self, depth, heuristic, tt_size_mb=16, tt_policy='depth', time_limit_ms=None,
+                 ordering=ORDERING_STRATEGIES, workers=1, seed=None, stats=False, endgame_empties=12,
+                 book=None, patterns=None):
+        """Initialize the AI with a specific depth and heuristic.
+
+        A transposition table of about `tt_size_mb` megabytes is kept between searches;
+        pass 0 or None to search without one. With `time_limit_ms` set, `get_move` deepens
+        iteratively until the budget runs out instead of searching to a fixed depth.
+        `ordering` lists the move ordering strategies to use (see MoveOrdering); pass an
+        empty tuple to search moves in board scan order. With `workers` > 1 the root moves
+        are split across that many processes. `seed` makes tie-breaking between equally
+        scored moves reproducible. With `stats` enabled, each `get_move` leaves a
+        SearchStats in `last_stats`. Table entries, killers and history carry over from
+        move to move, aged as the game moves on; see `ponder` for searching on the
+        opponent's time. Positions with at most `endgame_empties` empty
+        squares are solved exactly, scoring the final disc differential. `book` is an
+        opening book file (or OpeningBook) consulted before searching. `patterns` is the
+        pattern weights file used by heuristic 5 (default: patterns.bin, if present).
+        A search running in another thread can be followed with `progress` and stopped
+        with `cancel`. Any even board size is played (see Othello.BoardTables); the book,
+        the endgame solver and heuristic 5 are 8x8 only and are skipped (the heuristic
+        refused) on other sizes.
+        """
         self.depth = depth
         self.heuristic = heuristic
+        self.tt = TranspositionTable(tt_size_mb, tt_policy) if tt_size_mb else None
+        self.time_limit_ms = time_limit_ms
+        self.orderer = MoveOrderer(ordering)
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self._worker_config = (heuristic, tt_size_mb, tt_policy, tuple(ordering), patterns)
+        self._pool = None
+        self._worker_cancel = None  # Event shared with the parallel search workers, set by `cancel`
+        self._cancel_event = None  # In a parallel search worker, the parent's `_worker_cancel`
+        self.nodes = 0
+        self.nodes_per_depth = {}  # Nodes searched by each completed depth of the last search
+        self.completed_depth = 0
+        self.search_depth = 0  # Depth of the root search in progress
+        self.best_so_far = None  # (score, move) of the best root move found so far by that search
+        self._deadline = None
+        self._solver = None  # EndgameSolver in use by solve_endgame
+        self.cancelled = False  # Set by `cancel`; searches stop while it is set
+        self.collect_stats = stats
+        self.endgame_empties = endgame_empties
+        self.book = OpeningBook.open(book) if isinstance(book, str) else book
+        self.pattern_weights = PatternWeights.load(patterns) if heuristic == 5 else None
+        self.stats = None  # SearchStats of the search in progress, when collecting
+        self.last_stats = None
+        self._root_discs = None  # Discs on the board at the last search root
+        self._ponder_thread = None
+        self._ponder_solver = None
+        self._ponder_key = None  # Position key searched by the last ponder
+        self._ponder_result = None  # (depth, (score, move), solved exactly) of its deepest finished search
+        self._ponder_start = 0.0
+        self._ponder_ms = 0.0  # Time it ran for
+        self.ponder_hit = False  # Whether the last get_move played a ponder result without searching
 
-    def evaluate(self, game, player):
+    def get_move(self, game, player):
+        """Choose a move for `player` and return (score, move) like `minimax`."""
+        self.stop_pondering()
+        self.nodes, self.search_depth, self.best_so_far = 0, 0, None
+        self._set_board_size(game.size)
+        with self.searching(game):
+            if self.collect_stats:
+                return self._get_move_with_stats(game, player)
+            return self._get_move(game, player)
+
+    @contextmanager
+    def searching(self, game):
+        """Keep the state the heuristic follows incrementally (heuristic 5's pattern codes)
+        attached to `game` for a search, and detach it afterwards so later moves on the
+        game, by any player, pay nothing for it.
+        """
+        if self.heuristic != 5 or game.patterns is not None:
+            yield game
+            return
+        game.patterns = PatternState(game.black, game.white)
+        try:
+            yield game
+        finally:
+            game.patterns = None
+
+    def _set_board_size(self, size):
+        """Check the heuristic can play a size x size board and move the ordering tables to it."""
+        if size != 8 and self.heuristic == 5:
+            raise ValueError(f"Heuristic 5 (patterns) only plays 8x8 boards, not {size}x{size}")
+        if size != self.orderer.size and self.tt is not None and self._root_discs is not None:
+            self.tt.clear()  # Entries from the other size are only noise; a fresh table has none
+        self.orderer.set_board_size(size)
+
+    def _get_move_with_stats(self, game, player):
+        """Run `_get_move` with the hot paths temporarily wrapped by timing instrumentation.
+
+        The wrappers are instance attributes shadowing the methods, so nothing is paid
+        when statistics are off. Time spent inside parallel workers is not included.
+        """
+        stats = self.stats = self.last_stats = SearchStats()
+        game.valid_moves = stats.timed(game.valid_moves, "valid_moves")
+        game.make_move = stats.timed(game.make_move, "make_move")
+        game.undo_move = stats.timed(game.undo_move, "undo_move")
+        self.evaluate = stats.timed(self.evaluate, "evaluate")
+        start = time.perf_counter()
+        try:
+            score, move = self._get_move(game, player)
+        finally:
+            stats.seconds = time.perf_counter() - start
+            del game.valid_moves, game.make_move, game.undo_move, self.evaluate
+            self.stats = None
+        stats.score, stats.move = score, move
+        stats.nodes = self.nodes
+        stats.depth = self.completed_depth
+        stats.nodes_per_depth = dict(self.nodes_per_depth)
+        stats.principal_variation = self.principal_variation(game, player, move, self.completed_depth)
+        return score, move
+
+    def principal_variation(self, game, player, move, max_length):
+        """Follow best moves from the transposition table, starting with `move`."""
+        pv, played = [], []
+        maximizing = True
+        while move is not None and len(pv) < max_length and move in game.valid_moves(player):
+            pv.append(move)
+            played.append((move, player, game.make_move(move[0], move[1], player)))
+            player = 'O' if player == 'X' else 'X'
+            maximizing = not maximizing
+            move = None
+            if self.tt is not None:
+                key = game.position_key(player)
+                if not maximizing:
+                    key ^= MIN_NODE_KEY
+                entry = self.tt.probe(key)
+                if entry is not None:
+                    move = entry[4]
+        for (row, col), mover, flips in reversed(played):
+            game.undo_move(row, col, mover, flips)
+        return pv
+
+    def _get_move(self, game, player):
+        """Play from the book, solve the endgame exactly, or search with the configured depth or budget."""
+        if self.book is not None and game.size == 8:
+            hit = self.book.lookup(game, player)
+            if hit is not None:
+                self.nodes = self.completed_depth = 0
+                self.nodes_per_depth = {}
+                return hit
+        self.advance_root(game)
+        budget_ms = self.time_limit_ms
+        pondered_key, pondered = self._ponder_key, self._ponder_result
+        self._ponder_key = self._ponder_result = None
+        self.ponder_hit = False
+        if pondered_key == game.position_key(player):  # The opponent played the expected reply
+            if pondered is not None:
+                depth, result, solved = pondered
+                if solved or (budget_ms and self._ponder_ms >= budget_ms) or (not budget_ms and depth >= self.depth):
+                    self.nodes, self.completed_depth, self.nodes_per_depth = 0, depth, {}
+                    self.ponder_hit = True
+                    return result
+            if budget_ms:  # Time already spent on this position counts towards the budget
+                budget_ms = max(budget_ms - self._ponder_ms, budget_ms / 4)
+        start = time.perf_counter()
+        if game.size == 8 and game.empties() <= self.endgame_empties:
+            deadline = start + budget_ms / 1000 if budget_ms else None
+            try:
+                return self.solve_endgame(game, player, deadline)
+            except SolverTimeout:
+                if self.cancelled:
+                    raise SearchTimeout()
+                # Otherwise fall back to a heuristic search with whatever budget is left
+        if budget_ms:
+            remaining_ms = budget_ms - (time.perf_counter() - start) * 1000
+            return self.iterative_deepening(game, player, max(remaining_ms, 0))
+        self.nodes = 0
+        result = self._search_root(game, player, self.depth)
+        self.completed_depth = self.depth
+        self.nodes_per_depth = {self.depth: self.nodes}
+        return result
+
+    def advance_root(self, game):
+        """Age the state kept from earlier searches once the root has moved on in the game.
+
+        `get_move` and `ponder` call this themselves; call it before searching a new root
+        with `minimax` directly, so a table and history kept across games age as they would.
+        """
+        discs = (game.black | game.white).bit_count()
+        if discs == self._root_discs:
+            return
+        if self.tt is not None:
+            self.tt.new_search()
+        if self._root_discs is not None and discs > self._root_discs:
+            self.orderer.advance(discs - self._root_discs)  # One disc per ply, passes aside
+        else:  # A new game
+            self.orderer.clear()
+        self._root_discs = discs
+
+    def ponder(self, game, player):
+        """Search on the opponent's time: start searching, in a background thread, the
+        position after the opponent's expected reply, with `player` to move.
+
+        Call it once `player`'s move is on the board. The next `get_move` (or
+        `stop_pondering`) stops the thread. If the opponent plays the expected reply, the
+        table is already warm, and a finished fixed-depth search, an exact solve or a
+        search that ran for the whole time budget is played at once; otherwise the time
+        pondered counts towards the budget. Returns the expected reply, or None if there
+        is nothing to ponder.
+        """
+        self.stop_pondering()
+        self._ponder_key = self._ponder_result = None
+        opponent = 'O' if player == 'X' else 'X'
+        with self.searching(game):
+            reply = self.expected_reply(game, opponent)
+        if reply is None:
+            return None
+        self._set_board_size(game.size)
+        ponder_game = Othello(game.size)
+        ponder_game.restore(game.snapshot())
+        ponder_game.make_move(reply[0], reply[1], opponent)
+        if not ponder_game.move_mask(player):
+            return None
+        if game.size == 8 and ponder_game.empties() <= self.endgame_empties:
+            self._ponder_solver = EndgameSolver(math.inf)  # Made here so stop_pondering always sees it
+        self._ponder_key = ponder_game.position_key(player)
+        self._ponder_start = time.perf_counter()
+        self._deadline = math.inf  # stop_pondering lowers it to end the search
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(ponder_game, player), daemon=True)
+        self._ponder_thread.start()
+        return reply
+
+    def expected_reply(self, game, player):
+        """Guess `player`'s next move: the reply stored by the last search, else a shallow search."""
+        moves = game.valid_moves(player)
+        if not moves:
+            return None
+        if self.tt is not None:
+            entry = self.tt.probe(game.position_key(player) ^ MIN_NODE_KEY)  # A min node in our search
+            if entry is not None and entry[4] in moves:
+                return entry[4]
+        return self.minimax(game, 2, -math.inf, math.inf, True, player)[1]
+
+    def _ponder(self, game, player):
+        """Background thread body: deepen on `game` until stopped, keeping the latest result."""
+        self.advance_root(game)
+        try:
+            with self.searching(game):
+                self._ponder_search(game, player)
+        except (SearchTimeout, SolverTimeout):
+            pass  # Stopped; whatever finished is kept
+
+    def _ponder_search(self, game, player):
+        """Solve or deepen on the pondered position, keeping each finished result."""
+        if self._ponder_solver is not None:
+            own, opp = game.discs(player)
+            score, sq = self._ponder_solver.solve(own, opp)
+            move = None if sq is None else divmod(sq, 8)
+            self._ponder_result = (64 - (own | opp).bit_count(), (score, move), True)
+            return
+        max_depth = game.empties() if self.time_limit_ms else self.depth
+        best = None
+        for depth in range(1, max_depth + 1):
+            best = self.minimax(game, depth, -math.inf, math.inf, True, player,
+                                first_move=best[1] if best else None)
+            self._ponder_result = (depth, best, False)
+
+    def stop_pondering(self):
+        """Stop the background ponder search, if one is running, and wait for it to finish."""
+        if self._ponder_thread is None:
+            return
+        self._deadline = -math.inf  # Makes minimax raise SearchTimeout at its next clock check
+        if self._ponder_solver is not None:
+            self._ponder_solver.deadline = -math.inf
+        self._ponder_thread.join()
+        self._ponder_ms = (time.perf_counter() - self._ponder_start) * 1000
+        self._ponder_thread = self._ponder_solver = None
+        self._deadline = None
+
+    def cancel(self):
+        """Stop the search running in another thread: `get_move` raises SearchTimeout at its
+        next clock check, or returns early with a result that should be discarded. Root
+        moves being searched in worker processes (see `workers`) stop at theirs too.
+
+        Searches keep stopping until `cancelled` is cleared again, so clear it before
+        starting the next one.
+        """
+        self.cancelled = True
+        if self._worker_cancel is not None:  # Reaches the root moves running in worker processes
+            self._worker_cancel.set()
+        solver = self._solver
+        if solver is not None:
+            solver.deadline = -math.inf
+
+    def progress(self):
+        """Return (depth, nodes, (score, move) best so far or None) of the search in progress.
+
+        Meant to be polled from another thread while `get_move` runs; the values are read
+        without locking, so they can be a moment out of step with each other.
+        """
+        solver = self._solver
+        return self.search_depth, solver.nodes if solver is not None else self.nodes, self.best_so_far
+
+    def solve_endgame(self, game, player, deadline=None):
+        """Return (final disc differential, move) for `player` under perfect play by both sides.
+
+        Passes are played out inside the solver; the move is None if `player` must pass.
+        """
+        solver = self._solver = EndgameSolver(deadline)
+        if self.cancelled:  # Cancelled before the solver was visible to `cancel`
+            solver.deadline = -math.inf
+        own, opp = game.discs(player)
+        self.search_depth = 64 - (own | opp).bit_count()
+        try:
+            score, sq = solver.solve(own, opp)
+        finally:
+            self._solver = None
+        self.nodes = solver.nodes
+        self.completed_depth = 64 - (own | opp).bit_count()
+        self.nodes_per_depth = {self.completed_depth: solver.nodes}
+        return score, None if sq is None else divmod(sq, 8)
+
+    def iterative_deepening(self, game, player, time_limit_ms, max_depth=None):
+        """Search depth 1, 2, ... until the time budget runs out.
+
+        Returns the result of the deepest fully completed iteration; each iteration
+        searches the previous best move first.
+        """
+        start = time.perf_counter()
+        budget = time_limit_ms / 1000
+        if max_depth is None:
+            max_depth = game.empties()  # Deeper than the empties is pointless
+        snapshot = game.snapshot()
+
+        self._deadline = None  # Depth 1 always completes so there is always a move to play
+        self.nodes = 0
+        best = self._search_root(game, player, 1)
+        self.completed_depth = 1
+        self.nodes_per_depth = {1: self.nodes}
+        self._deadline = start + budget
+        try:
+            for depth in range(2, max_depth + 1):
+                # The next iteration costs several times all previous ones, so don't start
+                # it unless at least half the budget is left.
+                if time.perf_counter() - start > budget / 2:
+                    break
+                nodes_before = self.nodes
+                try:
+                    best = self._search_root(game, player, depth, first_move=best[1])
+                except SearchTimeout:
+                    game.restore(snapshot)
+                    break
+                self.completed_depth = depth
+                self.nodes_per_depth[depth] = self.nodes - nodes_before
+        finally:
+            self._deadline = None
+        return best
+
+    def _search_root(self, game, player, depth, first_move=None):
+        """Run one full-window root search, in parallel when workers are configured."""
+        self.search_depth = depth
+        if self.workers > 1 and depth > 1:
+            return self.parallel_search(game, player, depth, first_move)
+        return self.minimax(game, depth, -math.inf, math.inf, True, player, first_move=first_move)
+
+    def parallel_search(self, game, player, depth, first_move=None):
+        """Search the root moves across worker processes and return (score, move) like `minimax`.
+
+        The first move is searched here to get a bound (young brothers wait); the rest run
+        concurrently with a window that only resolves scores at least that good exactly,
+        so ties are found reliably and broken with the seeded random generator.
+        """
+        moves = game.valid_moves(player)
+        if not moves:
+            return self.minimax(game, depth, -math.inf, math.inf, True, player)
         opponent = 'O' if player == 'X' else 'X'
+        entry = self.tt.probe(game.position_key(player)) if self.tt is not None else None
+        self.orderer.order(moves, 0, player, entry[4] if entry is not None else None)  # As minimax orders
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        eldest = moves[0]
+        flips = game.make_move(eldest[0], eldest[1], player)
+        best_score, _ = self.minimax(game, depth - 1, -math.inf, math.inf, False, opponent, ply=1)
+        game.undo_move(eldest[0], eldest[1], player, flips)
+        best_moves = [eldest]
+
+        if len(moves) > 1:
+            if self._pool is None:  # The cancel signal can only reach workers as they start
+                self._worker_cancel = multiprocessing.Event()
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self._worker_cancel,))
+            self._worker_cancel.clear()
+            if self.cancelled:  # Cancelled before the clear, so the workers would miss it
+                raise SearchTimeout()
+            bound = math.nextafter(best_score, -math.inf)  # Anything above this is >= best_score
+            # Workers get a wall-clock deadline since queued tasks start late and
+            # perf_counter values are not comparable across processes.
+            deadline = None if self._deadline is None else time.time() + self._deadline - time.perf_counter()
+            snapshot = game.snapshot()
+            futures = [self._pool.submit(_search_root_move, self._worker_config, game.size, snapshot, player,
+                                         move, depth, bound, deadline) for move in moves[1:]]
+            for move, future in zip(moves[1:], futures):
+                score, nodes = future.result()
+                self.nodes += nodes
+                if score is None:  # The worker ran out of time or was cancelled
+                    for pending in futures:
+                        pending.cancel()
+                    wait(futures)  # The rest stop at their next clock check; let them before the next search
+                    raise SearchTimeout()
+                if score > best_score:
+                    best_score, best_moves = score, [move]
+                elif score == best_score:
+                    best_moves.append(move)
+        return best_score, self.break_tie(best_moves)
+
+    def break_tie(self, moves):
+        """Pick one of equally scored root moves with the seeded generator, so both search
+        modes draw from it the same way.
+        """
+        return moves[0] if len(moves) == 1 else self.rng.choice(moves)
+
+    def close(self):
+        """Stop pondering and shut down the worker processes used by parallel search, if any."""
+        self.stop_pondering()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def evaluate(self, game, player):
+        """Score the position for `player`; every heuristic runs in constant time on the bitboards."""
+        own, opp = game.discs(player)
         if self.heuristic == 1:  # Disc difference
-            return sum(row.count(player) for row in game.board) - sum(row.count(opponent) for row in game.board)
+            return own.bit_count() - opp.bit_count()
         elif self.heuristic == 2:  # Corner control
-            corners = [(0, 0), (0, 7), (7, 0), (7, 7)]
-            return sum(1 for r, c in corners if game.board[r][c] == player)
+            return (own & game.tables.corner_mask).bit_count()
         elif self.heuristic == 3:  # Mobility advantage
             return self.heuristic_mobility(game, player)
+        elif self.heuristic == 4:  # Weighted squares
+            return game.positional_score(player)
+        elif self.heuristic == 5:  # Pattern tables, with codes kept up to date by make_move/undo_move
+            # Outside `searching` the codes are computed from scratch, which is correct but slow
+            codes = game.patterns.codes if game.patterns is not None else pattern_codes(game.black, game.white)
+            score = self.pattern_weights.score(codes, (game.black | game.white).bit_count())
+            return score if player == 'X' else -score
 
     def heuristic_corners(self, board, player):
         """Heuristic to prioritize corners."""
-        corners = [(0, 0), (0, 7), (7, 0), (7, 7)]
+        last = len(board) - 1
+        corners = [(0, 0), (0, last), (last, 0), (last, last)]
         return sum(1 for r, c in corners if board[r][c] == player)
 
     def heuristic_mobility(self, game, player):
         """Evaluate mobility by counting the number of valid moves."""
-        return len(game.valid_moves(player))
+        return game.move_mask(player).bit_count()
 
-    def minimax(self, game, depth, alpha, beta, maximizing, player):
-        """Minimax algorithm with alpha-beta pruning."""
-        if depth == 0 or game.is_game_over():
-            return self.evaluate(game, player), None
+    def minimax(self, game, depth, alpha, beta, maximizing, player, first_move=None, ply=0):
+        """Minimax algorithm with alpha-beta pruning, searching in place with make/undo.
 
-        moves = game.valid_moves(player)
-        if not moves:
-            return self.evaluate(game, player), None
+        Scores are always evaluated for the maximizing player, whichever side is to move.
+        `first_move`, if valid, is searched before the other moves; `ply` is the distance
+        from the root, used to index killer moves.
+        """
+        self.nodes += 1
+        if not self.nodes % TIME_CHECK_INTERVAL:
+            if (self.cancelled or (self._deadline is not None and time.perf_counter() > self._deadline)
+                    or (self._cancel_event is not None and self._cancel_event.is_set())):
+                raise SearchTimeout()
 
         opponent = 'O' if player == 'X' else 'X'
+        if depth == 0:
+            return self.evaluate(game, player if maximizing else opponent), None
+
+        moves = game.valid_moves(player)
+        if not moves:  # Also covers the game-over case
+            return self.evaluate(game, player if maximizing else opponent), None
+
+        hash_move = None
+        tt = self.tt if depth > 1 else None  # Frontier nodes are cheaper to search than to store
+        if tt is not None:
+            key = game.position_key(player)
+            if not maximizing:
+                key ^= MIN_NODE_KEY
+            alpha_orig, beta_orig = alpha, beta
+            entry = tt.probe(key)
+            if entry is not None:
+                _, entry_depth, flag, score, hash_move, _ = entry
+                if entry_depth >= depth:
+                    if flag == EXACT:
+                        return score, hash_move
+                    if flag == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if beta <= alpha:
+                        return score, hash_move
+
+        self.orderer.order(moves, ply, player, hash_move)
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        # A score equal to the best so far is only a bound unless the window lets it be
+        # exact, so ties are collected at the root only, where the window is opened just
+        # past the best score (as in parallel_search); other nodes keep their first best move.
         best_moves = []
         if maximizing:
             max_eval = -math.inf
             for move in moves:
-                game_copy = copy.deepcopy(game)
-                game_copy.make_move(move[0], move[1], player)
-                eval_score, _ = self.minimax(game_copy, depth - 1, alpha, beta, False, opponent)
+                child_alpha = math.nextafter(alpha, -math.inf) if best_moves and not ply else alpha
+                flips = game.make_move(move[0], move[1], player)
+                eval_score, _ = self.minimax(game, depth - 1, child_alpha, beta, False, opponent, ply=ply + 1)
+                game.undo_move(move[0], move[1], player, flips)
                 if eval_score > max_eval:
                     max_eval = eval_score
                     best_moves = [move]
-                elif eval_score == max_eval:
+                    if not ply:
+                        self.best_so_far = (eval_score, move)
+                elif eval_score == max_eval and eval_score > child_alpha:
                     best_moves.append(move)
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self.orderer.record_cutoff(move, ply, player, depth)
+                    if self.stats is not None:
+                        self.stats.record_cutoff(ply)
                     break
-            return max_eval, choice(best_moves)
+            best_score, best_move = max_eval, self.break_tie(best_moves)
         else:
             min_eval = math.inf
             for move in moves:
-                game_copy = copy.deepcopy(game)
-                game_copy.make_move(move[0], move[1], player)
-                eval_score, _ = self.minimax(game_copy, depth - 1, alpha, beta, True, opponent)
+                child_beta = math.nextafter(beta, math.inf) if best_moves and not ply else beta
+                flips = game.make_move(move[0], move[1], player)
+                eval_score, _ = self.minimax(game, depth - 1, alpha, child_beta, True, opponent, ply=ply + 1)
+                game.undo_move(move[0], move[1], player, flips)
                 if eval_score < min_eval:
                     min_eval = eval_score
                     best_moves = [move]
-                elif eval_score == min_eval:
+                elif eval_score == min_eval and eval_score < child_beta:
                     best_moves.append(move)
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self.orderer.record_cutoff(move, ply, player, depth)
+                    if self.stats is not None:
+                        self.stats.record_cutoff(ply)
                     break
-            return min_eval, choice(best_moves)
\ No newline at end of file
+            best_score, best_move = min_eval, self.break_tie(best_moves)
+
+        if tt is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER
+            elif best_score >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            tt.store(key, depth, flag, best_score, best_move)
+        return best_score, best_move
+
+_worker_players = {}  # Per-process AIPlayers, reused so their tables survive between root moves
+_cancel_event = None  # The parent AIPlayer's cancel signal, set in each worker by `_init_worker`
+
+
+def _init_worker(cancel_event):
+    """Worker process initializer: keep the parent's cancel Event, which cannot be passed with each task."""
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _search_root_move(config, size, snapshot, player, move, depth, bound, deadline):
+    """Worker process entry point: search one root move on a size x size board and return (score, nodes).
+
+    The score is None if the wall-clock `deadline` passed or the parent AIPlayer was
+    cancelled before the search finished.
+    """
+    ai = _worker_players.get(config)
+    if ai is None:
+        heuristic, tt_size_mb, tt_policy, ordering, patterns = config
+        ai = _worker_players[config] = AIPlayer(depth, heuristic, tt_size_mb, tt_policy, ordering=ordering,
+                                                patterns=patterns)
+        ai._cancel_event = _cancel_event
+    if _cancel_event is not None and _cancel_event.is_set():
+        return None, 0
+    ai.orderer.set_board_size(size)
+    game = Othello(size)
+    game.restore(snapshot)
+    game.make_move(move[0], move[1], player)
+    ai.advance_root(game)
+    opponent = 'O' if player == 'X' else 'X'
+    ai.nodes = 0
+    ai._deadline = None if deadline is None else time.perf_counter() + deadline - time.time()
+    try:
+        with ai.searching(game):
+            score, _ = ai.minimax(game, depth - 1, bound, math.inf, False, opponent, ply=1)
+    except SearchTimeout:
+        score = None
+    finally:
+        ai._deadline = None
+    return score, ai.nodes
@@ -0,0 +1,181 @@
+import numpy as np
+from Othello import NOT_EDGE_FILES, CORNER_MASK, WEIGHT_CLASSES
+
+# Batch versions of the engine's bitboard operations. Positions are held as two
+# uint64 arrays, `own` (the side the scores are for) and `opp`, one entry per position.
+U64 = np.uint64
+SHIFTS = ((1, True), (8, False), (7, True), (9, True))  # (shift, needs the a/h file guard)
+HEURISTICS = (1, 2, 3, 4)  # The AIPlayer heuristics evaluate_batch has kernels for
+CHUNK = 16384  # Positions evaluated per pass, so the temporaries stay in cache
+
+
+def pack(positions):
+    """Pack an iterable of (own, opp) bitboard pairs into two uint64 arrays."""
+    pairs = np.array(list(positions), dtype=U64).reshape(-1, 2)
+    return pairs[:, 0].copy(), pairs[:, 1].copy()
+
+
+def from_boards(boards):
+    """Convert an (N, 64) int8 array (1 own, -1 opponent, 0 empty; row-major) into (own, opp) arrays."""
+    boards = np.asarray(boards).reshape(-1, 64)
+    own = np.packbits(boards == 1, axis=1, bitorder="little").view("<u8")[:, 0]
+    opp = np.packbits(boards == -1, axis=1, bitorder="little").view("<u8")[:, 0]
+    return own.astype(U64), opp.astype(U64)
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x):
+        """Number of set bits in each element."""
+        return np.bitwise_count(x).astype(np.int64)
+else:
+    def popcount(x):
+        """Number of set bits in each element (SWAR fallback for NumPy < 2.0)."""
+        x = x - ((x >> U64(1)) & U64(0x5555555555555555))
+        x = (x & U64(0x3333333333333333)) + ((x >> U64(2)) & U64(0x3333333333333333))
+        x = (x + (x >> U64(4))) & U64(0x0F0F0F0F0F0F0F0F)
+        return ((x * U64(0x0101010101010101)) >> U64(56)).astype(np.int64)
+
+
+def move_masks(own, opp):
+    """Vectorised Othello.move_mask: the legal-move bitmask of every position."""
+    empty = ~(own | opp)
+    inner = opp & U64(NOT_EDGE_FILES)
+    moves = np.zeros_like(own)
+    for shift, guarded in SHIFTS:
+        mask = inner if guarded else opp
+        single, double = U64(shift), U64(shift + shift)
+
+        t = mask & (own << single)
+        t |= mask & (t << single)
+        pre = mask & (mask << single)
+        t |= pre & (t << double)
+        t |= pre & (t << double)
+        moves |= t << single
+
+        t = mask & (own >> single)
+        t |= mask & (t >> single)
+        pre = mask & (mask >> single)
+        t |= pre & (t >> double)
+        t |= pre & (t >> double)
+        moves |= t >> single
+    return moves & empty
+
+
+def flip_masks(own, opp, bits):
+    """Vectorised Othello.flip_mask, where `bits` holds the single-bit move of each position."""
+    inner = opp & U64(NOT_EDGE_FILES)
+    flips = np.zeros_like(own)
+    zero = U64(0)
+    for shift, guarded in SHIFTS:
+        mask = inner if guarded else opp
+        single = U64(shift)
+        for step in (np.left_shift, np.right_shift):
+            run = mask & step(bits, single)
+            for _ in range(5):  # A run is at most 6 discs long
+                run |= mask & step(run, single)
+            flips |= np.where(step(run, single) & own != zero, run, zero)
+    return flips
+
+
+def evaluate_batch(own, opp, heuristic):
+    """Score every position for `own` exactly as AIPlayer.evaluate does for `heuristic` 1-4."""
+    if len(own) <= CHUNK:
+        return _evaluate_chunk(own, opp, heuristic)
+    scores = np.empty(len(own), dtype=np.int64)
+    for start in range(0, len(own), CHUNK):
+        scores[start:start + CHUNK] = _evaluate_chunk(own[start:start + CHUNK], opp[start:start + CHUNK], heuristic)
+    return scores
+
+
+def _evaluate_chunk(own, opp, heuristic):
+    if heuristic == 1:  # Disc difference
+        return popcount(own) - popcount(opp)
+    elif heuristic == 2:  # Corner control
+        return popcount(own & U64(CORNER_MASK))
+    elif heuristic == 3:  # Mobility advantage
+        return popcount(move_masks(own, opp))
+    elif heuristic == 4:  # Weighted squares
+        score = np.zeros(own.shape, dtype=np.int64)
+        for weight, mask in WEIGHT_CLASSES:
+            score += weight * (popcount(own & U64(mask)) - popcount(opp & U64(mask)))
+        return score
+    raise ValueError(f"Unknown heuristic {heuristic}")
+
+
+def expand(own, opp):
+    """Play every legal move of every position at once.
+
+    Returns (child_own, child_opp, parent, square): the children seen from the side
+    now to move (the opponent of each parent's `own`), the index of each child's
+    parent, and the square played. Positions with no legal move have no children.
+    """
+    moves = move_masks(own, opp)
+    parent = np.arange(len(own))
+    children = []
+    while True:
+        has_move = moves != U64(0)
+        if not has_move.any():
+            break
+        moves, parent = moves[has_move], parent[has_move]
+        bits = moves & (~moves + U64(1))  # Lowest set bit
+        moves ^= bits
+        p_own, p_opp = own[parent], opp[parent]
+        flips = flip_masks(p_own, p_opp, bits)
+        children.append((p_opp ^ flips, p_own | flips | bits, parent, bits))
+
+    if not children:
+        empty = np.zeros(0, dtype=U64)
+        return empty, empty, np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.int64)
+    child_own, child_opp, parents, bits = (np.concatenate(column) for column in zip(*children))
+    order = np.argsort(parents, kind="stable")  # Group each parent's children together
+    squares = popcount(bits[order] - U64(1))
+    return child_own[order], child_opp[order], parents[order], squares
+
+
+def minimax_batch(own, opp, depth, heuristic, maximizing=True):
+    """Full-width minimax of every position to `depth` plies, with `own` to move.
+
+    Scores are for the maximizing player - `own` when `maximizing`, else `opp` - and,
+    like AIPlayer.minimax, a position with no legal move is scored as a leaf. There is
+    no pruning: each level is expanded in one pass and all of its leaves are evaluated
+    together, so this suits shallow searches over many positions, not one deep search.
+    """
+    levels = []
+    for _ in range(depth):
+        child_own, child_opp, parent, _ = expand(own, opp)
+        levels.append((own, opp, parent))
+        own, opp = child_own, child_opp
+
+    scores = _evaluate_for(own, opp, heuristic, maximizing == (depth % 2 == 0))
+    for ply in range(depth - 1, -1, -1):
+        own, opp, parent = levels[ply]
+        max_to_move = maximizing == (ply % 2 == 0)
+        level_scores = _evaluate_for(own, opp, heuristic, max_to_move)  # Kept where there is no move
+        if len(parent):
+            starts = np.flatnonzero(np.r_[True, parent[1:] != parent[:-1]])
+            reduce = np.maximum if max_to_move else np.minimum
+            level_scores[parent[starts]] = reduce.reduceat(scores, starts)
+        scores = level_scores
+    return scores
+
+
+def best_moves(own, opp, depth, heuristic):
+    """Return (scores, squares) of the best move for `own` in every position; square -1 means no move.
+
+    Ties go to the lowest square index, matching AIPlayer's row-major move order.
+    """
+    child_own, child_opp, parent, squares = expand(own, opp)
+    child_scores = minimax_batch(child_own, child_opp, depth - 1, heuristic, maximizing=False)
+    best_score = np.zeros(len(own), dtype=np.int64)
+    best_square = np.full(len(own), -1, dtype=np.int64)
+    if len(parent):
+        order = np.lexsort((squares, -child_scores, parent))  # Each parent's best child first
+        first = order[np.r_[True, parent[order][1:] != parent[order][:-1]]]
+        best_score[parent[first]] = child_scores[first]
+        best_square[parent[first]] = squares[first]
+    return best_score, best_square
+
+
+def _evaluate_for(own, opp, heuristic, own_is_max):
+    """Evaluate for the maximizing player, who is `own` when `own_is_max` and `opp` otherwise."""
+    return evaluate_batch(own, opp, heuristic) if own_is_max else evaluate_batch(opp, own, heuristic)
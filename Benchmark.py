@@ -0,0 +1,539 @@
+import argparse
+import json
+import math
+import os
+import pickle
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from Othello import DIRECTIONS, Othello, Position, flip_mask, move_mask, position_from_moves
+from AIplayer import AIPlayer
+from EndgameSolver import EndgameSolver
+from GameRecord import LENGTH, GameRecord, RecordWriter, iter_records
+from OpeningBook import BookBuilder, OpeningBook, canonical_key, transform
+from TranspositionTable import EXACT, LOWER, UPPER, REPLACEMENT_POLICIES, TranspositionTable
+
+# Benchmark positions, given as move sequences from the initial position (passes implied).
+GAME_MOVES = ("e6 d6 c5 b6 c7 f6 g6 b8 b5 a5 c3 h6 a7 b7 e7 d8 e8 f8 c4 e3 f2 d3 f7 g7 h8 d7 g8 b3 c2 b1 "
+              "c1 e2 b4 d1 f3 c6 g5 f4 e1 f1 a2 h5 g2 h1 b2 a6 h4 a3 g1 a1 a4 g4 d2 f5 c8 a8 h2 h7 h3 g3").split()
+POSITIONS = {
+    "start": [],
+    "opening": GAME_MOVES[:6],
+    "midgame": GAME_MOVES[:24],
+    "endgame": GAME_MOVES[:46],
+}
+
+CHECK_SIZES = (4, 6, 8, 10, 26)  # Board sizes whose move generation --check always compares with the scanner
+
+# Known perft counts (passes count as a ply) used to check move generation.
+EXPECTED_PERFT = {
+    "start": {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092, 8: 390216},
+}
+
+
+def perft(game, depth, player, passed=False):
+    """Count the leaf positions `depth` plies ahead; a pass counts as a ply, a finished game is a leaf."""
+    if depth == 0:
+        return 1
+    opponent = 'O' if player == 'X' else 'X'
+    moves = game.valid_moves(player)
+    if not moves:
+        if passed:
+            return 1
+        return perft(game, depth - 1, opponent, True)
+    if depth == 1:
+        return len(moves)
+    total = 0
+    for row, col in moves:
+        flips = game.make_move(row, col, player)
+        total += perft(game, depth - 1, opponent)
+        game.undo_move(row, col, player, flips)
+    return total
+
+
+def run_perft(name, game, max_depth):
+    """Time perft to each depth up to `max_depth` and check against known counts."""
+    results = []
+    for depth in range(1, max_depth + 1):
+        start = time.perf_counter()
+        count = perft(game, depth, game.current_player)
+        seconds = time.perf_counter() - start
+        expected = EXPECTED_PERFT.get(name, {}).get(depth)
+        if expected is not None and count != expected:
+            raise AssertionError(f"perft({name}, {depth}) = {count}, expected {expected}")
+        results.append({"position": name, "depth": depth, "count": count, "seconds": seconds,
+                        "nodes_per_sec": count / seconds if seconds else 0.0})
+    return results
+
+
+def run_search(name, game, heuristic, depth, measure_memory=True):
+    """Time one fixed-depth search from a fresh AI and report nodes/sec and peak memory."""
+    ai = AIPlayer(depth, heuristic, seed=0)
+    snapshot = game.snapshot()
+    start = time.perf_counter()
+    score, move = ai.get_move(game, game.current_player)
+    seconds = time.perf_counter() - start
+    result = {"position": name, "heuristic": heuristic, "depth": depth, "seconds": seconds,
+              "nodes": ai.nodes, "nodes_per_sec": ai.nodes / seconds if seconds else 0.0,
+              "score": score, "move": move}
+
+    if measure_memory:  # Separate run, since tracing slows the search down several times
+        game.restore(snapshot)
+        tracemalloc.start()
+        ai = AIPlayer(depth, heuristic, seed=0)  # Inside the trace, so its table counts on every size
+        ai.get_move(game, game.current_player)
+        result["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    game.restore(snapshot)
+    return result
+
+
+def random_positions(count, seed=0, size=8):
+    """Play random games from the start and return `count` (game, player to move) positions."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game, player = Othello(size), 'X'
+        for _ in range(rng.randrange(size * size - 4)):
+            moves = game.valid_moves(player)
+            if moves:
+                game.make_move(*rng.choice(moves), player)
+            player = 'O' if player == 'X' else 'X'
+        positions.append((game, player))
+    return positions
+
+
+def reference_moves(board, player):
+    """Return {(row, col): squares flipped} for `player`, walking the board square by square
+    and direction by direction, with no bitboards.
+    """
+    opponent = 'O' if player == 'X' else 'X'
+    size = len(board)
+    moves = {}
+    for row in range(size):
+        for col in range(size):
+            if board[row][col] != '.':
+                continue
+            flipped = []
+            for dr, dc in DIRECTIONS:
+                run, r, c = [], row + dr, col + dc
+                while 0 <= r < size and 0 <= c < size and board[r][c] == opponent:
+                    run.append((r, c))
+                    r, c = r + dr, c + dc
+                if run and 0 <= r < size and 0 <= c < size and board[r][c] == player:
+                    flipped.extend(run)
+            if flipped:
+                moves[row, col] = sorted(flipped)
+    return moves
+
+
+def check_move_generation(count=500, size=8):
+    """Check the bitboard moves, flips, hashes and make/undo against `reference_moves` on random
+    size x size positions, raising AssertionError on the first difference; returns the positions checked.
+    """
+    fresh = Othello(size)  # Its board setter hashes from scratch
+    for index, (game, player) in enumerate(random_positions(count, seed=1, size=size)):
+        expected = reference_moves(game.board, player)
+        if game.valid_moves(player) != sorted(expected):
+            raise AssertionError(f"position {index}: moves {game.valid_moves(player)}, expected {sorted(expected)}")
+        snapshot = game.snapshot()
+        for (row, col), flipped in expected.items():
+            flips = game.make_move(row, col, player)
+            squares = sorted(divmod(sq, size) for sq in range(size * size) if flips >> sq & 1)
+            if squares != flipped:
+                raise AssertionError(f"position {index}, move {(row, col)}: flips {squares}, expected {flipped}")
+            fresh.board = game.board
+            if game.hash != fresh.hash:
+                raise AssertionError(f"position {index}, move {(row, col)}: incremental hash differs from a fresh one")
+            game.undo_move(row, col, player, flips)
+            if game.snapshot() != snapshot:
+                raise AssertionError(f"position {index}, move {(row, col)}: undo_move did not restore the position")
+    return count
+
+
+def check_transposition_table(count=60, max_depth=4):
+    """Check the table's replacement rules, then check that searches through a small table
+    (so that slots collide and entries are replaced) score every random position exactly as
+    a search without one, under both policies; raises AssertionError on a difference and
+    returns the positions checked.
+    """
+    tt = TranspositionTable(0.01)  # 64 slots, so keys 1 and 65 share a slot
+    tt.store(1, 5, EXACT, 10, (2, 3))
+    tt.store(65, 3, LOWER, 20, None)
+    if tt.probe(65) is not None or tt.probe(1)[1:5] != (5, EXACT, 10, (2, 3)):
+        raise AssertionError("'depth' policy replaced a deeper entry from the current search")
+    tt.new_search()
+    tt.store(65, 3, UPPER, 20, None)
+    if tt.probe(1) is not None or tt.probe(65)[1:] != (3, UPPER, 20, None, tt.generation):
+        raise AssertionError("'depth' policy kept an entry from an earlier search")
+    tt = TranspositionTable(0.01, 'always')
+    tt.store(1, 5, EXACT, 10, None)
+    tt.store(65, 1, LOWER, 20, None)
+    if tt.probe(1) is not None or tt.probe(65) is None:
+        raise AssertionError("'always' policy kept the old entry")
+
+    plain = AIPlayer(1, 4, tt_size_mb=0, endgame_empties=0)
+    for policy in REPLACEMENT_POLICIES:
+        ai = AIPlayer(1, 4, tt_size_mb=0.01, tt_policy=policy, endgame_empties=0)
+        for index, (game, player) in enumerate(random_positions(count, seed=4)):
+            ai.tt.clear()  # A deeper entry from another position could legitimately change a score
+            for depth in range(1, max_depth + 1):  # Shallower entries left for the next depth, as when deepening
+                ai.tt.new_search()
+                for maximizing in (True, False):
+                    expected = plain.minimax(game, depth, -math.inf, math.inf, maximizing, player)[0]
+                    # Fail-high, fail-low and open windows, so later searches cut off on stored bounds
+                    for alpha, beta in ((expected - 5, expected - 1), (expected + 1, expected + 5),
+                                        (-math.inf, math.inf)):
+                        score = ai.minimax(game, depth, alpha, beta, maximizing, player)[0]
+                        if not (score == expected if alpha < expected < beta else
+                                expected <= score <= alpha if expected <= alpha else beta <= score <= expected):
+                            raise AssertionError(f"position {index}: '{policy}' table search at depth {depth} "
+                                                 f"in window ({alpha}, {beta}) scored {score}, expected {expected}")
+        if policy == 'depth' and not ai.tt.rejected:
+            raise AssertionError("the table was never full enough to reject an entry")
+    return count
+
+
+def exhaustive_score(own, opp, passed=False):
+    """Return the final disc differential for `own` with perfect play, searching every line."""
+    moves = move_mask(own, opp)
+    if not moves:
+        if passed:
+            return own.bit_count() - opp.bit_count()
+        return -exhaustive_score(opp, own, True)
+    best = -64  # Below any reachable differential
+    for sq in range(64):
+        if moves >> sq & 1:
+            flips = flip_mask(own, opp, sq)
+            best = max(best, -exhaustive_score(opp ^ flips, own | flips | 1 << sq))
+    return best
+
+
+def check_endgame_solver(count=100, max_empties=9):
+    """Check EndgameSolver's scores and moves against `exhaustive_score` on random positions
+    with 1 to `max_empties` empties, raising AssertionError on a difference; returns the positions checked.
+    """
+    rng = random.Random(2)
+    for index in range(count):
+        empties = 1 + index % max_empties
+        game, player = Othello(), 'X'
+        while game.empties() > empties or not game.move_mask(player):
+            if game.is_game_over():
+                game, player = Othello(), 'X'
+                continue
+            moves = game.valid_moves(player)
+            if moves:
+                game.make_move(*rng.choice(moves), player)
+            player = 'O' if player == 'X' else 'X'
+        own, opp = game.discs(player)
+        score, sq = EndgameSolver().solve(own, opp)
+        expected = exhaustive_score(own, opp)
+        flips = flip_mask(own, opp, sq)
+        played = -exhaustive_score(opp ^ flips, own | flips | 1 << sq)
+        if score != expected or played != expected:
+            raise AssertionError(f"position {index} ({empties} empties): solver scored {score} and its move "
+                                 f"{divmod(sq, 8)} scores {played}, expected {expected}")
+    return count
+
+
+def reference_symmetry(row, col, symmetry):
+    """Map a square through one of OpeningBook's 8 symmetries by its coordinates, with no bit tricks."""
+    if symmetry & 1:
+        row, col = col, row
+    if symmetry & 2:
+        row = 7 - row
+    if symmetry & 4:
+        col = 7 - col
+    return row, col
+
+
+def check_opening_book(count=200):
+    """Write a book of random positions and check that looking up each position under all 8
+    symmetries finds its move, mapped the same way; raises AssertionError on a difference and
+    returns the positions checked.
+    """
+    rng = random.Random(5)
+    builder = BookBuilder(None)
+    positions, moves = [], []
+    for game, player in random_positions(count * 2, seed=5):
+        if len(positions) == count or not game.move_mask(player):
+            continue
+        if canonical_key(*game.discs(player))[0] in builder.entries:  # One move per position
+            continue
+        move = rng.choice(game.valid_moves(player))
+        builder.add(game, player, move, len(positions), 1)
+        positions.append((game, player))
+        moves.append(move)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        builder.write(path)
+        book = OpeningBook(path)
+        try:
+            for index, ((game, player), move) in enumerate(zip(positions, moves)):
+                for symmetry in range(8):
+                    black, white = transform(game.black, symmetry), transform(game.white, symmetry)
+                    image = Position(black, white, player).to_game()
+                    # A position that some symmetry maps onto itself has equally good images of the move
+                    allowed = {reference_symmetry(*reference_symmetry(*move, symmetry), fixed) for fixed in range(8)
+                               if (transform(black, fixed), transform(white, fixed)) == (black, white)}
+                    found = book.lookup(image, player)
+                    if found is None or found[0] != index or found[1] not in allowed:
+                        raise AssertionError(f"position {index}, symmetry {symmetry}: book lookup gave {found}, "
+                                             f"expected ({index}, one of {sorted(allowed)})")
+        finally:
+            book.data.close()
+    return len(positions)
+
+
+def check_positions(count=500):
+    """Check Position's conversions, serialisation and `play` against the `Othello` game they were
+    taken from on random positions, raising AssertionError on a difference; returns the positions checked.
+    """
+    positions = []
+    for index, (game, player) in enumerate(random_positions(count, seed=6)):
+        game.current_player = player
+        position = game.position()
+        positions.append(position)
+        if (position.black, position.white, position.player) != (game.black, game.white, player):
+            raise AssertionError(f"position {index}: {position!r} does not hold the game's bitboards")
+        for copy in (Position.from_bytes(position.to_bytes()), pickle.loads(pickle.dumps(position)),
+                     position.to_game().position()):
+            if copy != position or hash(copy) != hash(position):
+                raise AssertionError(f"position {index}: {position!r} came back as {copy!r}")
+        if position.board != game.board or position.valid_moves() != game.valid_moves(player):
+            raise AssertionError(f"position {index}: board or moves differ from the game's")
+        for row, col in game.valid_moves(player):
+            flips = game.make_move(row, col, player)
+            child = Position(game.black, game.white, 'O' if player == 'X' else 'X')
+            game.undo_move(row, col, player, flips)
+            if position.play(row, col) != child:
+                raise AssertionError(f"position {index}, move {(row, col)}: play gave {position.play(row, col)!r}, "
+                                     f"expected {child!r}")
+    if list(Position.unpack(Position.pack(positions))) != positions:
+        raise AssertionError("Position.unpack did not return the positions given to Position.pack")
+    overlapping = (1 | 1 << 64).to_bytes(Position.SIZE, "little")
+    for bad in (lambda: Position(1, 1), lambda: Position(1 << 64, 0), lambda: Position.from_bytes(overlapping)):
+        try:
+            bad()
+        except ValueError:
+            continue
+        raise AssertionError("a position with overlapping or oversized bitboards was accepted")
+    return count
+
+
+def check_game_records(count=100):
+    """Write random finished games, with passes and stats on some moves, to a record file and check
+    that reading them back gives the same records and that replaying each one reaches its final
+    score; raises AssertionError on a difference and returns the games checked.
+    """
+    rng = random.Random(7)
+    records = []
+    for index in range(count):
+        record, game, player = GameRecord({"game": index} if index % 2 else None), Othello(), 'X'
+        while not game.is_game_over():
+            move = rng.choice(game.valid_moves(player)) if game.move_mask(player) else None
+            stats = None
+            if rng.random() < 0.5:  # Values that survive the format's float32 fields exactly
+                stats = {"score": float(rng.randrange(-64, 65)), "depth": rng.randrange(1, 20),
+                         "nodes": rng.randrange(1 << 32), "ms": rng.randrange(1 << 16) / 8}
+            record.add(move, stats)
+            if move is not None:
+                game.make_move(*move, player)
+            player = 'O' if player == 'X' else 'X'
+        record.finish(game)
+        records.append(record)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.rec")
+        with RecordWriter(path) as writer:
+            for record in records:
+                writer.write(record)
+        with open(path, "ab") as f:  # A record cut short by an interrupted writer is skipped
+            data = records[0].to_bytes()
+            f.write(LENGTH.pack(len(data)) + data[:-1])
+        read = list(iter_records(path))
+    if len(read) != count:
+        raise AssertionError(f"read back {len(read)} records, expected {count}")
+    for index, (record, copy) in enumerate(zip(records, read)):
+        if (copy.moves, copy.stats, copy.info, copy.result) != (record.moves, record.stats, record.info, record.result):
+            raise AssertionError(f"game {index}: record read back differs from the one written")
+        for game, player, move, _ in copy.replay():  # Each step stops before its move is played
+            pass
+        if move is not None:
+            game.make_move(*move, player)
+        if game.count_discs() != record.result:
+            raise AssertionError(f"game {index}: replay ends at {game.count_discs()}, expected {record.result}")
+    return count
+
+
+def check_batch_eval(count=300, max_depth=3):
+    """Check BatchEval's move masks, evaluation and full-width search against the scalar code on
+    random positions, raising AssertionError on a difference; returns the positions checked.
+    """
+    import BatchEval  # NumPy is only needed for this check
+    positions = random_positions(count, seed=3)
+    own, opp = BatchEval.pack(game.discs(player) for game, player in positions)
+    masks = BatchEval.move_masks(own, opp)
+    for index, (game, player) in enumerate(positions):
+        if int(masks[index]) != game.move_mask(player):
+            raise AssertionError(f"position {index}: batch move mask differs from Othello.move_mask")
+    for heuristic in BatchEval.HEURISTICS:
+        ai = AIPlayer(1, heuristic, tt_size_mb=0)
+        scores = BatchEval.evaluate_batch(own, opp, heuristic)
+        for depth in range(1, max_depth + 1):
+            searched = BatchEval.minimax_batch(own, opp, depth, heuristic)
+            for index, (game, player) in enumerate(positions):
+                if depth == 1 and scores[index] != ai.evaluate(game, player):
+                    raise AssertionError(f"position {index}: batch h{heuristic} evaluation differs from AIPlayer.evaluate")
+                expected = ai.minimax(game, depth, -math.inf, math.inf, True, player)[0]
+                if searched[index] != expected:
+                    raise AssertionError(f"position {index}: batch h{heuristic} depth {depth} score "
+                                         f"{searched[index]}, expected {expected}")
+    return count
+
+
+def run_checks(sizes=()):
+    """Check the fast code against slow reference versions, printing one line per check.
+
+    Move generation is checked on CHECK_SIZES and on any other board `sizes` being benchmarked.
+    """
+    print("checks")
+    for size in sorted(set(CHECK_SIZES) | set(sizes)):
+        count = check_move_generation(500 if size <= 10 else 50, size)
+        print(f"  move generation {size}x{size}: {count} random positions match the square-by-square scanner")
+    count = check_transposition_table()
+    print(f"  transposition table: {count} random positions score the same with a small table as without one")
+    count = check_endgame_solver()
+    print(f"  endgame solver: {count} random endgames match an exhaustive search")
+    count = check_opening_book()
+    print(f"  opening book: {count} random positions are found under all 8 symmetries")
+    count = check_positions()
+    print(f"  positions: {count} random positions round-trip through bytes, pickle and Othello")
+    count = check_game_records()
+    print(f"  game records: {count} random games round-trip through a record file and replay to their scores")
+    try:
+        count = check_batch_eval()
+    except ImportError:
+        print("  batch evaluation: skipped, NumPy is not installed")
+    else:
+        print(f"  batch evaluation: {count} random positions match the scalar code at depths 1-3")
+
+
+def run_batch(heuristics, count=2000, repeat=50):
+    """Compare AIPlayer.evaluate one position at a time with BatchEval on the same positions."""
+    import BatchEval  # NumPy is only needed for this part of the benchmark
+    positions = random_positions(count)
+    own, opp = BatchEval.pack(game.discs(player) for game, player in positions)
+    own, opp = own.repeat(repeat), opp.repeat(repeat)
+    results = []
+    for heuristic in heuristics:
+        if heuristic not in BatchEval.HEURISTICS:
+            print(f"Skipping heuristic {heuristic} in the batch timings: BatchEval has no kernel for it")
+            continue
+        ai = AIPlayer(1, heuristic)
+        start = time.perf_counter()
+        for game, player in positions:
+            ai.evaluate(game, player)
+        single = (time.perf_counter() - start) / count
+        start = time.perf_counter()
+        BatchEval.evaluate_batch(own, opp, heuristic)
+        batch = (time.perf_counter() - start) / len(own)
+        results.append({"heuristic": heuristic, "single_us": single * 1e6, "batch_us": batch * 1e6,
+                        "speedup": single / batch if batch else 0.0})
+    return results
+
+
+def benchmark_positions(sizes=(8,)):
+    """Return {name: game} for the benchmark positions; 8x8 gets POSITIONS, other sizes their start."""
+    positions = {}
+    for size in sizes:
+        if size == 8:
+            positions.update((name, position_from_moves(moves)) for name, moves in POSITIONS.items())
+        else:
+            positions[f"start-{size}x{size}"] = Othello(size)
+    return positions
+
+
+def run_benchmark(perft_depth, depths, heuristics, measure_memory=True, batch=False, sizes=(8,)):
+    """Run perft and search timings over every benchmark position of the given board sizes."""
+    results = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "perft": [],
+        "search": [],
+    }
+    for name, game in benchmark_positions(sizes).items():
+        results["perft"].extend(run_perft(name, game, perft_depth))
+        for heuristic in heuristics:
+            if heuristic == 5 and game.size != 8:  # The pattern tables are 8x8 only
+                continue
+            for depth in depths:
+                results["search"].append(run_search(name, game, heuristic, depth, measure_memory))
+    if batch:
+        results["batch"] = run_batch(heuristics)
+    return results
+
+
+def print_results(results, baseline=None):
+    """Print a results table, with speed ratios against `baseline` when given."""
+    def ratio(section, entry, keys):
+        if baseline is None:
+            return ""
+        for old in baseline[section]:
+            if all(old[k] == entry[k] for k in keys):
+                if section == "perft" and old["count"] != entry["count"]:
+                    return "  COUNT MISMATCH (baseline {})".format(old["count"])
+                return f"  x{entry['nodes_per_sec'] / old['nodes_per_sec']:.2f} vs baseline" if old["nodes_per_sec"] else ""
+        return "  (not in baseline)"
+
+    print("perft")
+    for entry in results["perft"]:
+        print(f"  {entry['position']:>11} depth {entry['depth']}: {entry['count']:>10} leaves "
+              f"{entry['seconds']:8.3f}s {entry['nodes_per_sec']:>12,.0f} nodes/s"
+              + ratio("perft", entry, ("position", "depth")))
+    print("search")
+    for entry in results["search"]:
+        memory = f" {entry['peak_kb']:8.0f} KB peak" if "peak_kb" in entry else ""
+        print(f"  {entry['position']:>11} h{entry['heuristic']} depth {entry['depth']}: {entry['nodes']:>8} nodes "
+              f"{entry['seconds']:8.3f}s {entry['nodes_per_sec']:>10,.0f} nodes/s{memory}"
+              + ratio("search", entry, ("position", "heuristic", "depth")))
+    if "batch" in results:
+        print("batch evaluation")
+        for entry in results["batch"]:
+            print(f"  h{entry['heuristic']}: {entry['single_us']:8.3f}us one at a time, "
+                  f"{entry['batch_us']:8.3f}us batched, x{entry['speedup']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark move generation and search on fixed positions.")
+    parser.add_argument("--perft-depth", type=int, default=6)
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 4, 6])
+    parser.add_argument("--heuristics", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak-memory runs")
+    parser.add_argument("--batch", action="store_true", help="Also time NumPy batch evaluation (BatchEval.py)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8],
+                        help="Board sizes to benchmark; sizes other than 8 use their start position")
+    parser.add_argument("--check", action="store_true",
+                        help="First check the engine against slow reference implementations")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a JSON file written by --save")
+    args = parser.parse_args()
+
+    if args.check:
+        run_checks(args.sizes)
+    results = run_benchmark(args.perft_depth, args.depths, args.heuristics, not args.no_memory, args.batch,
+                            args.sizes)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import time
+from Othello import FULL_MASK, move_mask, flip_mask
+
+FASTEST_FIRST_EMPTIES = 7  # Above this many empties, order moves by the opponent's resulting mobility
+QUADRANT_MASKS = (0x0F0F0F0F, 0xF0F0F0F0, 0x0F0F0F0F << 32, 0xF0F0F0F0 << 32)
+WIN_BOUND = 65  # Larger than any possible disc differential
+TIME_CHECK_INTERVAL = 1024  # Nodes searched between clock checks
+
+
+class SolverTimeout(Exception):
+    """Raised when the solver's deadline passes before the position is solved."""
+
+
+class EndgameSolver:
+    def __init__(self, deadline=None):
+        """Exact solver returning final disc differentials; works on raw (own, opponent) bitboards.
+
+        `deadline` is a time.perf_counter() value after which solving raises SolverTimeout.
+        """
+        self.nodes = 0
+        self.deadline = deadline
+
+    def solve(self, own, opp):
+        """Return (final disc differential for `own`, best square index) with perfect play.
+
+        The square is None when `own` has to pass.
+        """
+        moves = move_mask(own, opp)
+        if not moves:
+            return self._negamax(own, opp, -WIN_BOUND, WIN_BOUND), None
+        alpha, best_sq = -WIN_BOUND, None
+        for sq in self._order(own, opp, moves):
+            flips = flip_mask(own, opp, sq)
+            score = -self._negamax(opp ^ flips, own | flips | (1 << sq), -WIN_BOUND, -alpha)
+            if score > alpha:
+                alpha, best_sq = score, sq
+        return alpha, best_sq
+
+    def _negamax(self, own, opp, alpha, beta):
+        """Alpha-beta negamax to the end of the game, handing the last three empties to fast paths."""
+        empty = ~(own | opp) & FULL_MASK
+        empties = empty.bit_count()
+        if empties <= 3:
+            squares = [sq for sq in range(64) if empty >> sq & 1]
+            if empties == 3:
+                return self._last3(own, opp, *squares, alpha, beta)
+            if empties == 2:
+                return self._last2(own, opp, *squares, alpha, beta)
+            if empties == 1:
+                return self._last1(own, opp, squares[0])
+            return own.bit_count() - opp.bit_count()
+
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes % TIME_CHECK_INTERVAL:
+            if time.perf_counter() > self.deadline:
+                raise SolverTimeout()
+        moves = move_mask(own, opp)
+        if not moves:
+            if not move_mask(opp, own):  # Neither side can move: the game is over
+                return own.bit_count() - opp.bit_count()
+            return -self._negamax(opp, own, -beta, -alpha)
+
+        best = -WIN_BOUND
+        for sq in self._order(own, opp, moves, empty):
+            flips = flip_mask(own, opp, sq)
+            score = -self._negamax(opp ^ flips, own | flips | (1 << sq), -beta, -alpha)
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
+
+    def _order(self, own, opp, moves, empty=None):
+        """Return move squares in search order.
+
+        With many empties, moves that leave the opponent fewest replies come first
+        (fastest-first); near the end, moves into quadrants with an odd number of
+        empties come first (parity), so we tend to get the last move in each region.
+        """
+        if empty is None:
+            empty = ~(own | opp) & FULL_MASK
+        odd = 0
+        for quadrant in QUADRANT_MASKS:
+            if (empty & quadrant).bit_count() & 1:
+                odd |= quadrant
+
+        if empty.bit_count() > FASTEST_FIRST_EMPTIES:
+            scored = []
+            while moves:
+                low = moves & -moves
+                sq = low.bit_length() - 1
+                flips = flip_mask(own, opp, sq)
+                mobility = move_mask(opp ^ flips, own | flips | low).bit_count()
+                scored.append((mobility * 2 - (1 if low & odd else 0), sq))
+                moves ^= low
+            scored.sort()
+            return [sq for _, sq in scored]
+
+        ordered = []
+        for group in (moves & odd, moves & ~odd):
+            while group:
+                low = group & -group
+                ordered.append(low.bit_length() - 1)
+                group ^= low
+        return ordered
+
+    def _last1(self, own, opp, sq):
+        """Score with one empty square left (every other square is filled)."""
+        self.nodes += 1
+        diff = 2 * own.bit_count() - 63
+        flipped = flip_mask(own, opp, sq).bit_count()
+        if flipped:
+            return diff + 2 * flipped + 1
+        flipped = flip_mask(opp, own, sq).bit_count()
+        if flipped:
+            return diff - 2 * flipped - 1
+        return diff  # Nobody can play the last square
+
+    def _last2(self, own, opp, a, b, alpha, beta, passed=False):
+        """Score with two empty squares left."""
+        self.nodes += 1
+        best = -WIN_BOUND
+        flips = flip_mask(own, opp, a)
+        if flips:
+            best = -self._last1(opp ^ flips, own | flips | (1 << a), b)
+        if best < beta:
+            flips = flip_mask(own, opp, b)
+            if flips:
+                best = max(best, -self._last1(opp ^ flips, own | flips | (1 << b), a))
+        if best == -WIN_BOUND:  # No move here
+            if passed:
+                return own.bit_count() - opp.bit_count()
+            return -self._last2(opp, own, a, b, -beta, -alpha, True)
+        return best
+
+    def _last3(self, own, opp, a, b, c, alpha, beta, passed=False):
+        """Score with three empty squares left."""
+        self.nodes += 1
+        best = -WIN_BOUND
+        for sq, x, y in ((a, b, c), (b, a, c), (c, a, b)):
+            flips = flip_mask(own, opp, sq)
+            if flips:
+                score = -self._last2(opp ^ flips, own | flips | (1 << sq), x, y, -beta, -max(alpha, best))
+                if score > best:
+                    best = score
+                    if best >= beta:
+                        return best
+        if best == -WIN_BOUND:
+            if passed:
+                return own.bit_count() - opp.bit_count()
+            return -self._last3(opp, own, a, b, c, -beta, -alpha, True)
+        return best
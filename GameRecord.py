@@ -0,0 +1,337 @@
+import argparse
+import json
+import math
+import os
+import struct
+import time
+from multiprocessing import Pool
+from Othello import Othello, move_to_notation, notation_to_move, square_bit
+from AIplayer import AIPlayer
+from EndgameSolver import EndgameSolver
+
+# Record file: a 16-byte header, then one record per game, appended as games finish.
+# Each record is its body length, then:
+#   BODY_HEADER  flags, ply count, final black and white discs, info length
+#   info         UTF-8 JSON object (players, settings, ...), possibly empty
+#   moves        one byte per ply: square index row * 8 + col, or PASS
+#   stats        if HAS_STATS, one MOVE_STATS entry per ply
+MAGIC = b"OTHREC01"
+HEADER = struct.Struct("<8s8x")
+LENGTH = struct.Struct("<I")
+BODY_HEADER = struct.Struct("<BBBBH")
+MOVE_STATS = struct.Struct("<?BfIf")  # Present, depth, score, nodes, milliseconds
+HAS_STATS = 1
+PASS = 64
+
+
+def move_stats(ai, score, seconds):
+    """Return the per-move stats to record for a move an AIPlayer just chose in `seconds`."""
+    return {"score": score, "depth": ai.completed_depth, "nodes": ai.nodes, "ms": round(seconds * 1000, 3)}
+
+
+def _square_index(text):
+    row, col = notation_to_move(text)
+    return row * 8 + col
+
+
+class GameRecord:
+    def __init__(self, info=None):
+        """One game: its moves in standard notation ("pass" for passes), optional search
+        stats per move, free-form `info` (player names, settings) and the final disc counts.
+        """
+        self.moves = []
+        self.stats = []  # Per move: a `move_stats` dict, or None
+        self.info = info or {}
+        self.result = None  # (black discs, white discs) once finished
+
+    @classmethod
+    def from_moves(cls, moves, info=None, size=8):
+        """Build a finished record from standard-notation moves with passes implied, as
+        written by Tournament.py, checking every move on the way. Records hold 8x8 games
+        only, so any other `size` is rejected.
+        """
+        if size != 8:
+            raise ValueError(f"game records hold 8x8 games, not {size}x{size}")
+        record = cls(info)
+        game, player = Othello(), 'X'
+        for text in moves:
+            if not game.move_mask(player):
+                record.add(None)
+                player = 'O' if player == 'X' else 'X'
+            move = notation_to_move(text)
+            if not game.move_mask(player) & square_bit(*move):
+                raise ValueError(f"illegal move {text!r} at ply {len(record.moves) + 1}")
+            game.make_move(*move, player)
+            record.add(move)
+            player = 'O' if player == 'X' else 'X'
+        record.result = game.count_discs()
+        return record
+
+    def add(self, move, stats=None):
+        """Append a (row, col) move, or None for a pass, with optional `move_stats`."""
+        self.moves.append("pass" if move is None else move_to_notation(move))
+        self.stats.append(stats)
+
+    def finish(self, game):
+        """Record the final disc counts of the finished `game`."""
+        self.result = game.count_discs()
+
+    def replay(self):
+        """Yield (game, player, move, stats) for every ply, with `game` positioned before the
+        move; the move is (row, col) or None for a pass. The same Othello game is updated
+        in place with `make_move` after each step, so copy it (e.g. `game.position()`) to keep it.
+
+        Raises ValueError if the record contains an illegal move or pass.
+        """
+        game = Othello()
+        for ply, (text, stats) in enumerate(zip(self.moves, self.stats), start=1):
+            player = game.current_player
+            legal = game.move_mask(player)
+            move = None if text == "pass" else notation_to_move(text)
+            if (move is None and legal) or (move is not None and not legal & square_bit(*move)):
+                raise ValueError(f"illegal move {text!r} for {player} at ply {ply}")
+            yield game, player, move, stats
+            if move is not None:
+                game.make_move(*move, player)
+            game.current_player = 'O' if player == 'X' else 'X'
+
+    def to_bytes(self):
+        """Serialise the record body (without its length prefix)."""
+        info = json.dumps(self.info, separators=(",", ":")).encode() if self.info else b""
+        has_stats = any(stats is not None for stats in self.stats)
+        black, white = self.result or (0, 0)
+        parts = [BODY_HEADER.pack(HAS_STATS if has_stats else 0, len(self.moves), black, white, len(info)), info,
+                 bytes(PASS if text == "pass" else _square_index(text) for text in self.moves)]
+        if has_stats:
+            for stats in self.stats:
+                if stats is None:
+                    parts.append(MOVE_STATS.pack(False, 0, 0.0, 0, 0.0))
+                else:
+                    parts.append(MOVE_STATS.pack(True, stats["depth"], stats["score"], stats["nodes"], stats["ms"]))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Read a record body written by `to_bytes`."""
+        flags, plies, black, white, info_length = BODY_HEADER.unpack_from(data)
+        offset = BODY_HEADER.size
+        record = cls(json.loads(data[offset:offset + info_length]) if info_length else None)
+        offset += info_length
+        for sq in data[offset:offset + plies]:
+            record.moves.append("pass" if sq == PASS else move_to_notation(divmod(sq, 8)))
+        offset += plies
+        if flags & HAS_STATS:
+            for present, depth, score, nodes, ms in MOVE_STATS.iter_unpack(data[offset:offset + plies * MOVE_STATS.size]):
+                record.stats.append({"score": score, "depth": depth, "nodes": nodes, "ms": round(ms, 3)}
+                                    if present else None)
+        else:
+            record.stats = [None] * plies
+        if black or white:
+            record.result = (black, white)
+        return record
+
+
+def record_offsets(path):
+    """Return (file offset, body length) of every complete record, reading only the length prefixes.
+
+    A record cut short at the end of the file (a writer interrupted mid-write) is left out.
+    """
+    offsets = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if HEADER.unpack(f.read(HEADER.size))[0] != MAGIC:
+            raise ValueError(f"{path} is not a game record file")
+        while True:
+            prefix = f.read(LENGTH.size)
+            if len(prefix) < LENGTH.size:
+                return offsets
+            length, = LENGTH.unpack(prefix)
+            if f.tell() + length > size:
+                return offsets
+            offsets.append((f.tell(), length))
+            f.seek(length, 1)
+
+
+def iter_record_data(path):
+    """Yield the raw body of every record in the file, reading one record at a time."""
+    with open(path, "rb") as f:
+        if HEADER.unpack(f.read(HEADER.size))[0] != MAGIC:
+            raise ValueError(f"{path} is not a game record file")
+        while True:
+            prefix = f.read(LENGTH.size)
+            if len(prefix) < LENGTH.size:
+                return
+            length, = LENGTH.unpack(prefix)
+            data = f.read(length)
+            if len(data) < length:  # Cut short by an interrupted writer
+                return
+            yield data
+
+
+def iter_records(path):
+    """Yield every GameRecord in the file without loading the whole file."""
+    for data in iter_record_data(path):
+        yield GameRecord.from_bytes(data)
+
+
+class RecordWriter:
+    def __init__(self, path):
+        """Append records to `path`, creating it if needed.
+
+        A partial record left at the end by an interrupted writer is cut off first, so the
+        file stays readable. Every record is written and flushed in one go.
+        """
+        self.file = open(path, "ab+")
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC))
+        else:
+            offsets = record_offsets(path)
+            self.file.truncate(offsets[-1][0] + offsets[-1][1] if offsets else HEADER.size)
+        self.file.flush()
+        self.count = 0
+
+    def write(self, record):
+        data = record.to_bytes()
+        self.file.write(LENGTH.pack(len(data)) + data)
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_move(ai, game, player, move, endgame_empties):
+    """Return (best score, best move, score of `move`) for `player`, all from `player`'s side.
+
+    Positions with at most `endgame_empties` empty squares are solved exactly (final disc
+    differential); others are searched to `ai.depth` with `ai`'s heuristic. `move` is
+    searched first with a full window, then the other moves only need to beat it.
+    """
+    opponent = 'O' if player == 'X' else 'X'
+    empties = 64 - (game.black | game.white).bit_count()
+    moves = game.valid_moves(player)
+    moves.remove(move)
+    moves.insert(0, move)
+    best_score = best_move = played_score = None
+    with ai.searching(game):
+        for candidate in moves:
+            flips = game.make_move(candidate[0], candidate[1], player)
+            if empties <= endgame_empties:
+                own, opp = game.discs(opponent)
+                score = -EndgameSolver().solve(own, opp)[0]
+            else:
+                alpha = -math.inf if best_score is None else best_score
+                score, _ = ai.minimax(game, ai.depth - 1, alpha, math.inf, False, opponent, ply=1)
+            game.undo_move(candidate[0], candidate[1], player, flips)
+            if played_score is None:
+                played_score = score
+            if best_score is None or score > best_score:
+                best_score, best_move = score, candidate
+    return best_score, best_move, played_score
+
+
+_worker_players = {}  # Per-process AIPlayers by (depth, heuristic), reused across games
+
+
+def _analyze_game(task):
+    """Pool worker entry point: re-score every move of one record."""
+    index, data, depth, heuristic, endgame_empties = task
+    ai = _worker_players.get((depth, heuristic))
+    if ai is None:
+        ai = _worker_players[depth, heuristic] = AIPlayer(depth, heuristic)
+    record = GameRecord.from_bytes(data)
+    moves, loss = [], {'X': 0.0, 'O': 0.0}
+    for ply, (game, player, move, _) in enumerate(record.replay(), start=1):
+        if move is None:
+            continue
+        ai.advance_root(game)  # A new generation per move, and fresh killers and history per game
+        best_score, best_move, played_score = score_move(ai, game, player, move, endgame_empties)
+        loss[player] += best_score - played_score
+        moves.append({"ply": ply, "player": player, "move": move_to_notation(move), "score": played_score,
+                      "best": move_to_notation(best_move), "best_score": best_score,
+                      "loss": best_score - played_score})
+    return {"game": index, "info": record.info, "result": record.result, "loss": loss, "moves": moves}
+
+
+def analyze(path, output, depth=4, heuristic=4, endgame_empties=10, processes=None, blunder=None):
+    """Re-score every move of every game in `path` across worker processes, streaming one JSON
+    line per game to `output` in archive order.
+
+    Each move gets the score of the best move and the played move's loss against it. Returns
+    (games, moves analysed, moves losing at least `blunder`).
+    """
+    tasks = ((index, data, depth, heuristic, endgame_empties) for index, data in enumerate(iter_record_data(path)))
+    games = moves = blunders = 0
+    with open(output, "w") as f, Pool(processes) as pool:
+        for analysis in pool.imap(_analyze_game, tasks, chunksize=4):
+            f.write(json.dumps(analysis) + "\n")
+            games += 1
+            moves += len(analysis["moves"])
+            if blunder is not None:
+                blunders += sum(1 for move in analysis["moves"] if move["loss"] >= blunder)
+    return games, moves, blunders
+
+
+def import_tournament(results, path):
+    """Append the 8x8 games of a Tournament.py JSONL results file to a record file.
+
+    Returns (games appended, games skipped for being played on another board size).
+    """
+    skipped = 0
+    with open(results) as f, RecordWriter(path) as writer:
+        for line in f:
+            result = json.loads(line)
+            if result.get("size", 8) != 8:
+                skipped += 1
+                continue
+            writer.write(GameRecord.from_moves(result["moves"], {"black": result["black"], "white": result["white"]}))
+    return writer.count, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, import and analyse game record files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    show = commands.add_parser("show", help="Print the games of a record file")
+    show.add_argument("records")
+
+    imp = commands.add_parser("import", help="Append Tournament.py JSONL results to a record file")
+    imp.add_argument("results")
+    imp.add_argument("records")
+
+    ana = commands.add_parser("analyze", help="Re-score every move of every game in worker processes")
+    ana.add_argument("records")
+    ana.add_argument("--depth", type=int, default=4)
+    ana.add_argument("--heuristic", type=int, default=4)
+    ana.add_argument("--endgame-empties", type=int, default=10, help="Solve positions with this many empties exactly")
+    ana.add_argument("--blunder", type=float, default=None, help="Count moves losing at least this much")
+    ana.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    ana.add_argument("--output", default="analysis.jsonl")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "show":
+        for index, record in enumerate(iter_records(args.records)):
+            result = "unfinished" if record.result is None else "%d-%d" % record.result
+            print(f"#{index} {json.dumps(record.info)} {result}: {' '.join(record.moves)}")
+    elif args.command == "import":
+        count, skipped = import_tournament(args.results, args.records)
+        print(f"Appended {count} games to {args.records}"
+              + (f", skipping {skipped} not played on 8x8" if skipped else ""))
+    else:
+        games, moves, blunders = analyze(args.records, args.output, args.depth, args.heuristic,
+                                         args.endgame_empties, args.processes, args.blunder)
+        report = f"Analysed {moves} moves of {games} games in {time.perf_counter() - start:.1f}s"
+        if args.blunder is not None:
+            report += f", {blunders} losing at least {args.blunder}"
+        print(f"{report}; written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from Othello import Othello, move_to_notation, notation_to_move
+from AIplayer import AIPlayer
+from GameRecord import GameRecord, RecordWriter, move_stats
+
+# Line-oriented JSON protocol: every request and reply is one JSON object per line.
+#   {"cmd": "new", "color": "X", "depth": 3, "heuristic": 4, "move_time_ms": 500, "clock_ms": 300000}
+#   {"cmd": "move", "move": "d3"}
+#   {"cmd": "state"} / {"cmd": "stats"} / {"cmd": "quit"}
+# Replies have a "type" of "state", "stats" or "error". Each connection plays one game
+# at a time; the AI's replies (and any forced passes) are played before the next state
+# is sent, so every state has either the human to move or the game over.
+MAX_LINE = 4096  # Longest request line accepted
+
+_worker_players = {}  # Per-process AIPlayers by (depth, heuristic, move_time_ms), shared by all sessions
+
+
+def _positive_number(request, name, limit=math.inf):
+    """Return the optional request field `name` as a finite number in (0, limit], or None if absent."""
+    value = request.get(name)
+    if value is None:
+        return None
+    if (isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+            or not 0 < value <= limit):
+        bound = "" if limit == math.inf else f" up to {limit}"
+        raise ValueError(f"{name} must be a positive, finite number{bound}")
+    return value
+
+
+def _ai_move(config, snapshot, player):
+    """Pool worker entry point: return (move, search stats for the game record) for `player`."""
+    ai = _worker_players.get(config)
+    if ai is None:
+        depth, heuristic, move_time_ms = config
+        ai = _worker_players[config] = AIPlayer(depth, heuristic, time_limit_ms=move_time_ms)
+    game = Othello()
+    game.restore(snapshot)
+    start = time.perf_counter()
+    score, move = ai.get_move(game, player)
+    return move, move_stats(ai, score, time.perf_counter() - start)
+
+
+class Session:
+    def __init__(self, human, depth, heuristic, move_time_ms=None, clock_ms=None):
+        """One game between a connected human playing `human` and the AI.
+
+        `move_time_ms` is the AI's budget per move (None for a fixed-depth search);
+        `clock_ms` is the human's total thinking time for the game (None for untimed).
+        """
+        self.game = Othello()
+        self.human = human
+        self.ai = 'O' if human == 'X' else 'X'
+        self.config = (depth, heuristic, move_time_ms)
+        self.moves = []  # Standard notation, "pass" for forced passes
+        depth_label = f"t{move_time_ms}" if move_time_ms else f"d{depth}"
+        ai_label = f"server-{depth_label}h{heuristic}"
+        self.record = GameRecord({"black": "client" if human == 'X' else ai_label,
+                                  "white": "client" if human == 'O' else ai_label})
+        self.clock_ms = clock_ms
+        self.turn_started = None  # Event loop time the human's clock started
+        self.timer = None  # Handle flagging the human when the clock runs out
+        self.result = None  # "X", "O" or "draw" once finished; "timeout" if the human ran out of time
+
+    def state(self):
+        """Return the position and game status as a reply message."""
+        game, player = self.game, self.game.current_player
+        black, white = game.count_discs()
+        return {
+            "type": "state",
+            "board": ["".join(row) for row in game.board],
+            "to_move": None if self.result else player,
+            "legal": [] if self.result else [move_to_notation(move) for move in game.valid_moves(player)],
+            "moves": self.moves,
+            "discs": {"X": black, "O": white},
+            "clock_ms": None if self.clock_ms is None else max(0, round(self.clock_ms)),
+            "result": self.result,
+        }
+
+    def play(self, move, stats=None):
+        """Play `move` (None to pass) for the side to move and hand the turn over."""
+        player = self.game.current_player
+        if move is not None:
+            self.game.make_move(*move, player)
+        self.moves.append("pass" if move is None else move_to_notation(move))
+        self.record.add(move, stats)
+        self.game.current_player = 'O' if player == 'X' else 'X'
+
+
+class GameServer:
+    def __init__(self, workers=None, max_waiting=256, record_path=None, max_move_time_ms=10000):
+        """Serve games over TCP, computing AI moves in a pool of `workers` processes.
+
+        At most `workers` AI moves run at once. Once `max_waiting` more are queued for
+        the pool, new moves are refused with a "busy" error until the queue drains.
+        Finished games are appended to the game record file `record_path`, if given.
+        Games may give the AI at most `max_move_time_ms` per move.
+        """
+        self.workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.ai_slots = asyncio.Semaphore(self.workers)
+        self.max_waiting = max_waiting
+        self.max_move_time_ms = max_move_time_ms
+        self.waiting = 0  # AI moves queued for or running in the pool
+        self.sessions = 0  # Open connections
+        self.games_played = 0
+        self.recorder = RecordWriter(record_path) if record_path else None
+
+    async def handle(self, reader, writer):
+        """Serve one connection until it closes or sends "quit"."""
+        self.sessions += 1
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # Line too long, or the client went away
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    command = request["cmd"]
+                except (ValueError, KeyError, TypeError):
+                    await self.send(writer, {"type": "error", "message": "expected a JSON object with a \"cmd\""})
+                    continue
+                if command == "quit":
+                    break
+                session = await self.dispatch(command, request, session, writer)
+        finally:
+            self.sessions -= 1
+            if session is not None and session.timer is not None:
+                session.timer.cancel()
+            writer.close()
+
+    async def dispatch(self, command, request, session, writer):
+        """Run one command and return the connection's (possibly new) session."""
+        if command == "stats":
+            await self.send(writer, {"type": "stats", "sessions": self.sessions, "waiting": self.waiting,
+                                     "workers": self.workers, "games_played": self.games_played})
+        elif command == "state":
+            if session is None:
+                await self.send(writer, {"type": "error", "message": "no game; send \"new\" first"})
+            else:
+                await self.send(writer, session.state())
+        elif command in ("new", "move"):
+            if self.waiting >= self.max_waiting:
+                await self.send(writer, {"type": "error", "message": "busy", "retry": True})
+            elif command == "new":
+                session = await self.new_game(request, session, writer)
+            else:
+                await self.human_move(request, session, writer)
+        else:
+            await self.send(writer, {"type": "error", "message": f"unknown command {command!r}"})
+        return session
+
+    async def new_game(self, request, old, writer):
+        """Start a game from a "new" request, replacing the connection's current one."""
+        try:
+            color = request.get("color", "X")
+            if color not in ("X", "O"):
+                raise ValueError("color must be \"X\" or \"O\"")
+            depth, heuristic = int(request.get("depth", 3)), int(request.get("heuristic", 4))
+            if not 1 <= depth <= 10 or not 1 <= heuristic <= 5:
+                raise ValueError("depth must be 1-10 and heuristic 1-5")
+            move_time_ms = _positive_number(request, "move_time_ms", self.max_move_time_ms)
+            clock_ms = _positive_number(request, "clock_ms")
+            session = Session(color, depth, heuristic, move_time_ms and int(math.ceil(move_time_ms)),
+                              clock_ms and float(clock_ms))
+        except (ValueError, TypeError) as error:
+            await self.send(writer, {"type": "error", "message": str(error)})
+            return old
+        if old is not None and old.timer is not None:
+            old.timer.cancel()
+        await self.advance(session, writer)
+        await self.send(writer, session.state())
+        return session
+
+    async def human_move(self, request, session, writer):
+        """Play the human's move from a "move" request, then the AI's replies."""
+        if session is None or session.result:
+            await self.send(writer, {"type": "error", "message": "no game in progress"})
+            return
+        try:
+            move = notation_to_move(request["move"])
+        except (KeyError, ValueError, IndexError, TypeError, AttributeError):
+            move = None
+        if move not in session.game.valid_moves(session.human):
+            await self.send(writer, {"type": "error", "message": f"illegal move {request.get('move')!r}"})
+            return
+        self.stop_clock(session)
+        if session.result:  # The clock ran out before the move arrived
+            await self.send(writer, session.state())
+            return
+        session.play(move)
+        await self.advance(session, writer)
+        await self.send(writer, session.state())
+
+    async def advance(self, session, writer):
+        """Play AI moves and forced passes until the human is to move or the game ends."""
+        game = session.game
+        while session.result is None:
+            player = game.current_player
+            if not game.move_mask(player):
+                if game.is_game_over():
+                    black, white = game.count_discs()
+                    session.result = "X" if black > white else "O" if white > black else "draw"
+                    self.finish(session)
+                    return
+                session.play(None)
+            elif player == session.ai:
+                move, stats = await self.ai_move(session)
+                session.play(move, stats)
+            else:
+                self.start_clock(session, writer)
+                return
+
+    async def ai_move(self, session):
+        """Compute the AI's move in the process pool, waiting for a free slot first."""
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        try:
+            async with self.ai_slots:  # Keeps the pool's own queue empty, so waiting is visible here
+                return await loop.run_in_executor(self.pool, _ai_move, session.config,
+                                                  session.game.snapshot(), session.ai)
+        finally:
+            self.waiting -= 1
+
+    def start_clock(self, session, writer):
+        """Start the human's clock, flagging the game if it runs out."""
+        if session.clock_ms is None:
+            return
+        loop = asyncio.get_running_loop()
+        session.turn_started = loop.time()
+        session.timer = loop.call_later(session.clock_ms / 1000, self.flag, session, writer)
+
+    def stop_clock(self, session):
+        """Stop the human's clock and charge the time used."""
+        if session.timer is None:
+            return
+        session.timer.cancel()
+        session.timer = None
+        session.clock_ms -= (asyncio.get_running_loop().time() - session.turn_started) * 1000
+        if session.clock_ms <= 0:
+            session.result = "timeout"
+            self.finish(session)
+
+    def flag(self, session, writer):
+        """Timer callback: the human's clock ran out."""
+        session.timer = None
+        session.clock_ms = 0
+        session.result = "timeout"
+        self.finish(session)
+        if not writer.is_closing():
+            writer.write(json.dumps(session.state()).encode() + b"\n")
+
+    def finish(self, session):
+        """Count a finished game and append it to the record file."""
+        self.games_played += 1
+        if self.recorder is not None:
+            session.record.info["result"] = session.result
+            session.record.finish(session.game)
+            self.recorder.write(session.record)
+
+    async def send(self, writer, message):
+        """Write one reply line, waiting while the client is slow to read (back-pressure)."""
+        writer.write(json.dumps(message).encode() + b"\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host, port):
+        """Accept connections until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        print(f"Serving Othello on {', '.join(str(s.getsockname()) for s in server.sockets)} "
+              f"with {self.workers} AI workers")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if self.recorder is not None:
+                self.recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Othello games over TCP with a JSON-lines protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="AI worker processes (default: all cores)")
+    parser.add_argument("--max-waiting", type=int, default=256,
+                        help="Queued AI moves before new moves are refused as busy")
+    parser.add_argument("--max-move-time-ms", type=int, default=10000,
+                        help="Longest AI time per move a game may ask for")
+    parser.add_argument("--record", help="Game record file to append finished games to (see GameRecord.py)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer(args.workers, args.max_waiting, args.record, args.max_move_time_ms).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
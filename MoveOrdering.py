@@ -0,0 +1,101 @@
+from Othello import BoardTables
+
+ORDERING_STRATEGIES = ('hash', 'killer', 'history', 'static')
+
+# Ordering scores pack the strategies into one integer, highest priority in the highest bits.
+HASH_BONUS = 1 << 40
+KILLER_BONUS = 1 << 30  # The most recent killer gets twice this
+HISTORY_SHIFT = 8  # Static weights (offset to be non-negative) live in the low 8 bits
+HISTORY_LIMIT = 1 << 20  # Halve the history table before it can reach the killer bonus
+
+
+def static_scores(size):
+    """Return {(row, col): static ordering score} for a size x size board, from its square weights."""
+    weights = BoardTables.for_size(size).square_weights
+    return {(r, c): weights[r][c] + 128 for r in range(size) for c in range(size)}
+
+
+STATIC_SCORES = static_scores(8)
+
+
+class MoveOrderer:
+    def __init__(self, strategies=ORDERING_STRATEGIES):
+        """Order moves using any combination of the strategies in ORDERING_STRATEGIES."""
+        unknown = set(strategies) - set(ORDERING_STRATEGIES)
+        if unknown:
+            raise ValueError(f"Unknown move ordering strategies {sorted(unknown)}, expected {ORDERING_STRATEGIES}")
+        self.strategies = tuple(strategies)
+        self.use_hash = 'hash' in strategies
+        self.use_killer = 'killer' in strategies
+        self.use_history = 'history' in strategies
+        self.use_static = 'static' in strategies
+        self.size = 8
+        self.static_scores = STATIC_SCORES
+        self.killers = {}  # ply -> [most recent killer, previous killer]
+        self.history = {'X': {}, 'O': {}}  # player -> move -> accumulated cutoff credit
+
+    def order(self, moves, ply, player, hash_move=None):
+        """Sort `moves` in place, most promising first, and return them."""
+        if len(moves) < 2 or not self.strategies:
+            return moves
+        killers = self.killers.get(ply, ()) if self.use_killer else ()
+        history = self.history[player] if self.use_history else None
+        if not self.use_hash:
+            hash_move = None
+        static = self.static_scores if self.use_static else None
+
+        scores = {}
+        for move in moves:
+            score = 0
+            if move == hash_move:
+                score = HASH_BONUS
+            elif move in killers:
+                score = KILLER_BONUS * (2 - killers.index(move))
+            if history:
+                score += history.get(move, 0) << HISTORY_SHIFT
+            if static:
+                score += static[move]
+            scores[move] = score
+        moves.sort(key=scores.__getitem__, reverse=True)  # Stable: ties keep scan order
+        return moves
+
+    def set_board_size(self, size):
+        """Switch the static scores to a size x size board, forgetting killers and history."""
+        if size != self.size:
+            self.size = size
+            self.static_scores = static_scores(size)
+            self.clear()
+
+    def record_cutoff(self, move, ply, player, depth):
+        """Credit a move that caused a beta cutoff."""
+        if self.use_killer:
+            killers = self.killers.setdefault(ply, [])
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[2:]
+        if self.use_history:
+            history = self.history[player]
+            credit = history.get(move, 0) + depth * depth
+            history[move] = credit
+            if credit > HISTORY_LIMIT:
+                self.age_history()
+
+    def advance(self, plies):
+        """Carry killers and history over to a search rooted `plies` plies further into the game.
+
+        Killers move to the ply they now sit at relative to the new root, and history
+        is aged so cutoffs from the new search soon dominate.
+        """
+        self.killers = {ply - plies: killers for ply, killers in self.killers.items() if ply >= plies}
+        self.age_history()
+
+    def age_history(self):
+        """Halve every history score so recent cutoffs outweigh old ones."""
+        for table in self.history.values():
+            for move in table:
+                table[move] >>= 1
+
+    def clear(self):
+        """Forget all killers and history."""
+        self.killers = {}
+        self.history = {'X': {}, 'O': {}}
@@ -0,0 +1,232 @@
+import argparse
+import json
+import mmap
+import struct
+from Othello import Othello, FULL_MASK, move_to_notation, notation_to_move
+
+MAGIC = b"OTHBOOK1"
+HEADER = struct.Struct("<8sI4x")  # Magic, record count, padding to 16 bytes
+RECORD = struct.Struct("<QBBh")  # Canonical position key, move square, search depth, score
+
+
+def flip_vertical(x):
+    """Mirror a bitboard top to bottom (row r -> 7 - r)."""
+    return int.from_bytes(x.to_bytes(8, "little"), "big")
+
+
+def mirror_horizontal(x):
+    """Mirror a bitboard left to right (col c -> 7 - c)."""
+    x = ((x >> 1) & 0x5555555555555555) | ((x & 0x5555555555555555) << 1)
+    x = ((x >> 2) & 0x3333333333333333) | ((x & 0x3333333333333333) << 2)
+    return ((x >> 4) & 0x0F0F0F0F0F0F0F0F) | ((x & 0x0F0F0F0F0F0F0F0F) << 4)
+
+
+def flip_diagonal(x):
+    """Mirror a bitboard about the a1-h8 diagonal (row and column swap)."""
+    t = 0x0F0F0F0F00000000 & (x ^ (x << 28))
+    x ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (x ^ (x << 14))
+    x ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (x ^ (x << 7))
+    x ^= t ^ (t >> 7)
+    return x & FULL_MASK
+
+
+def transform(x, symmetry):
+    """Apply one of the 8 board symmetries (bit 0: diagonal, bit 1: vertical, bit 2: horizontal)."""
+    if symmetry & 1:
+        x = flip_diagonal(x)
+    if symmetry & 2:
+        x = flip_vertical(x)
+    if symmetry & 4:
+        x = mirror_horizontal(x)
+    return x
+
+
+def inverse_transform(x, symmetry):
+    """Undo `transform`; each mirror is its own inverse, so apply them in reverse order."""
+    if symmetry & 4:
+        x = mirror_horizontal(x)
+    if symmetry & 2:
+        x = flip_vertical(x)
+    if symmetry & 1:
+        x = flip_diagonal(x)
+    return x
+
+
+def _mix64(x):
+    """splitmix64 finaliser, used to fold a 128-bit position into a 64-bit key."""
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & FULL_MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & FULL_MASK
+    return x ^ (x >> 31)
+
+
+def canonical_key(own, opp):
+    """Return (key, symmetry) for the smallest of the 8 symmetric images of (own, opp)."""
+    best, best_symmetry = None, 0
+    for symmetry in range(8):
+        image = (transform(own, symmetry), transform(opp, symmetry))
+        if best is None or image < best:
+            best, best_symmetry = image, symmetry
+    return _mix64(best[0] ^ _mix64(best[1])), best_symmetry
+
+
+class OpeningBook:
+    _open_books = {}  # Path -> book, so every AIPlayer in a process shares one mapping
+
+    def __init__(self, path):
+        """Memory-map a book file; pages are shared by every process reading the same file."""
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book file")
+
+    @classmethod
+    def open(cls, path):
+        """Return the process-wide book for `path`, mapping it on first use."""
+        book = cls._open_books.get(path)
+        if book is None:
+            book = cls._open_books[path] = cls(path)
+        return book
+
+    def _find(self, key):
+        """Binary search the sorted records for `key` and return (move, depth, score) or None."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_key, sq, depth, score = RECORD.unpack_from(self.data, HEADER.size + mid * RECORD.size)
+            if record_key < key:
+                lo = mid + 1
+            elif record_key > key:
+                hi = mid
+            else:
+                return sq, depth, score
+        return None
+
+    def lookup(self, game, player):
+        """Return (score, move) for `player` to move in `game`, or None if the position is not in the book."""
+        own, opp = game.discs(player)
+        key, symmetry = canonical_key(own, opp)
+        found = self._find(key)
+        if found is None:
+            return None
+        sq, _, score = found
+        bit = inverse_transform(1 << sq, symmetry)
+        if not bit & game.move_mask(player):  # Guard against a key collision
+            return None
+        return score, divmod(bit.bit_length() - 1, 8)
+
+    def __len__(self):
+        return self.count
+
+
+class BookBuilder:
+    def __init__(self, ai):
+        """Collect book entries, scoring positions with `ai` (an AIPlayer)."""
+        self.ai = ai
+        self.entries = {}  # key -> (canonical move square, depth, score)
+
+    def add(self, game, player, move, score, depth):
+        """Record `move` as the book move for `player` to move in `game`."""
+        own, opp = game.discs(player)
+        key, symmetry = canonical_key(own, opp)
+        sq = transform(1 << (move[0] * 8 + move[1]), symmetry).bit_length() - 1
+        self.entries[key] = (sq, depth, max(-32768, min(32767, int(score))))
+
+    def expand(self, game, player, plies, width):
+        """Search every position reachable by following the `width` best moves for `plies` plies."""
+        own, opp = game.discs(player)
+        key, _ = canonical_key(own, opp)
+        if plies == 0 or key in self.entries:  # Symmetric positions are only expanded once
+            return
+        opponent = 'O' if player == 'X' else 'X'
+        moves = game.valid_moves(player)
+        if not moves:
+            if game.valid_moves(opponent):
+                self.expand(game, opponent, plies, width)
+            return
+
+        scored = []
+        with self.ai.searching(game):
+            for move in moves:  # Score every reply so the `width` best can be expanded
+                flips = game.make_move(move[0], move[1], player)
+                score, _ = self.ai.minimax(game, self.ai.depth - 1, -float('inf'), float('inf'), False, opponent,
+                                           ply=1)
+                game.undo_move(move[0], move[1], player, flips)
+                scored.append((score, move))
+        scored.sort(key=lambda item: -item[0])
+        self.add(game, player, scored[0][1], scored[0][0], self.ai.depth)
+
+        for _, move in scored[:width]:
+            flips = game.make_move(move[0], move[1], player)
+            self.expand(game, opponent, plies - 1, width)
+            game.undo_move(move[0], move[1], player, flips)
+
+    def add_games(self, games, plies):
+        """Add the winner's moves from the first `plies` moves of finished games.
+
+        `games` yields (moves in standard notation, winner, board size) triples, where
+        winner is "black", "white" or "draw"; a position keeps the first move recorded
+        for it. Games not played on 8x8 are skipped and their count returned; an
+        illegal move raises ValueError.
+        """
+        skipped = 0
+        for moves, winner, size in games:
+            if size != 8:
+                skipped += 1
+                continue
+            game, player = Othello(), 'X'
+            for ply, text in enumerate(moves[:plies], 1):
+                if not game.move_mask(player):  # Forced pass
+                    player = 'O' if player == 'X' else 'X'
+                move = notation_to_move(text)
+                if move not in game.valid_moves(player):
+                    raise ValueError(f"illegal move {text!r} at ply {ply}")
+                if winner == ("black" if player == 'X' else "white"):
+                    own, opp = game.discs(player)
+                    if canonical_key(own, opp)[0] not in self.entries:
+                        self.add(game, player, move, 0, 0)
+                game.make_move(*move, player)
+                player = 'O' if player == 'X' else 'X'
+        return skipped
+
+    def write(self, path):
+        """Write the entries as a sorted, fixed-width binary file."""
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.entries)))
+            for key in sorted(self.entries):
+                sq, depth, score = self.entries[key]
+                f.write(RECORD.pack(key, sq, depth, score))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book by searching the first plies.")
+    parser.add_argument("--plies", type=int, default=8, help="Plies from the start position to cover")
+    parser.add_argument("--width", type=int, default=2, help="Best moves expanded at each position")
+    parser.add_argument("--depth", type=int, default=5, help="Search depth used to score moves")
+    parser.add_argument("--heuristic", type=int, default=4)
+    parser.add_argument("--games", help="Also add winners' moves from a Tournament.py JSONL results file")
+    parser.add_argument("--output", default="book.bin")
+    args = parser.parse_args()
+
+    from AIplayer import AIPlayer  # Imported here because AIplayer itself imports this module
+    builder = BookBuilder(AIPlayer(args.depth, args.heuristic, endgame_empties=0))
+    builder.expand(Othello(), 'X', args.plies, args.width)  # Searched entries take precedence
+    if args.games:
+        with open(args.games) as f:
+            records = (json.loads(line) for line in f)
+            skipped = builder.add_games(((r["moves"], r["winner"], r.get("size", 8)) for r in records), args.plies)
+        if skipped:
+            print(f"Skipped {skipped} games not played on 8x8")
+    builder.write(args.output)
+    print(f"Wrote {len(builder.entries)} positions to {args.output}")
+    game = Othello()
+    hit = OpeningBook(args.output).lookup(game, 'X')
+    if hit:
+        print(f"Book move from the start position: {move_to_notation(hit[1])}")
+
+
+if __name__ == "__main__":
+    main()
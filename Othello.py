@@ -1,90 +1,561 @@
+import random
+
+FULL_MASK = 0xFFFFFFFFFFFFFFFF
+NOT_EDGE_FILES = 0x7E7E7E7E7E7E7E7E  # Every square except columns a and h
+CORNER_MASK = (1 << 0) | (1 << 7) | (1 << 56) | (1 << 63)
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Classic positional weights: corners first, X-squares (diagonal to a corner) and
+# C-squares (edge-adjacent to a corner) last.
+SQUARE_WEIGHTS = [
+    [100, -20, 10, 5, 5, 10, -20, 100],
+    [-20, -50, -2, -2, -2, -2, -50, -20],
+    [10, -2, -1, -1, -1, -1, -2, 10],
+    [5, -2, -1, -1, -1, -1, -2, 5],
+    [5, -2, -1, -1, -1, -1, -2, 5],
+    [10, -2, -1, -1, -1, -1, -2, 10],
+    [-20, -50, -2, -2, -2, -2, -50, -20],
+    [100, -20, 10, 5, 5, 10, -20, 100],
+]
+
+
+def square_bit(row, col):
+    """Return the bitboard bit for a (row, col) square."""
+    return 1 << (row * 8 + col)
+
+
+def _build_square_weights(size):
+    """Extend the SQUARE_WEIGHTS pattern to a size x size board (reproducing it for 8x8):
+    corners, then edges away from the corners, then the interior, with X- and C-squares last.
+    """
+    weights = []
+    for row in range(size):
+        cells = []
+        for col in range(size):
+            near, far = sorted((min(row, size - 1 - row), min(col, size - 1 - col)))
+            if near == 0:  # Edge: corner, C-square, then edge squares further from the corner
+                cells.append((100, -20, 10)[far] if far < 3 else 5)
+            elif near == 1:  # Second ring: X-square, then the rest
+                cells.append(-50 if far == 1 else -2)
+            else:
+                cells.append(-1)
+        weights.append(cells)
+    return weights
+
+
+def _build_weight_classes(weights=SQUARE_WEIGHTS):
+    """Group the squares by weight so a weighted sum takes one popcount per distinct weight."""
+    size = len(weights)
+    classes = {}
+    for row in range(size):
+        for col in range(size):
+            weight = weights[row][col]
+            classes[weight] = classes.get(weight, 0) | 1 << (row * size + col)
+    return tuple(classes.items())
+
+
+def _build_rays(size=8):
+    """Precompute, for every square, the bits along each direction in walking order."""
+    rays = []
+    for sq in range(size * size):
+        row, col = divmod(sq, size)
+        square_rays = []
+        for dr, dc in DIRECTIONS:
+            ray = []
+            r, c = row + dr, col + dc
+            while 0 <= r < size and 0 <= c < size:
+                ray.append(1 << (r * size + c))
+                r += dr
+                c += dc
+            if len(ray) >= 2:  # A flip needs at least one opponent disc and one own disc
+                square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+    return tuple(rays)
+
+
+RAYS = _build_rays()
+WEIGHT_CLASSES = _build_weight_classes()
+
+
+def _build_zobrist(size=8):
+    """Build fixed-seed Zobrist keys so hashes agree across processes and runs."""
+    rng = random.Random(0x0DE110 if size == 8 else f"zobrist{size}")
+    black = {1 << sq: rng.getrandbits(64) for sq in range(size * size)}
+    white = {1 << sq: rng.getrandbits(64) for sq in range(size * size)}
+    flip = {bit: black[bit] ^ white[bit] for bit in black}  # Toggles a disc between colours
+    return black, white, flip, rng.getrandbits(64)
+
+
+ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_FLIP, ZOBRIST_SIDE = _build_zobrist()
+
+
+def zobrist_hash(black, white):
+    """Compute the Zobrist hash of a position from scratch."""
+    h = 0
+    for bits, keys in ((black, ZOBRIST_BLACK), (white, ZOBRIST_WHITE)):
+        while bits:
+            low = bits & -bits
+            h ^= keys[low]
+            bits ^= low
+    return h
+
+
+def move_mask(own, opp):
+    """Return the bitmask of empty squares where `own` can play against `opp`."""
+    empty = ~(own | opp) & FULL_MASK
+    inner = opp & NOT_EDGE_FILES
+    moves = 0
+    # Horizontal and diagonal shifts use `inner` so runs cannot wrap around the a/h files.
+    # Each direction extends the run one step twice, then two steps twice (runs of up to 6).
+    for shift, mask in ((1, inner), (8, opp), (7, inner), (9, inner)):
+        double = shift + shift
+
+        t = mask & (own << shift)
+        t |= mask & (t << shift)
+        pre = mask & (mask << shift)
+        t |= pre & (t << double)
+        t |= pre & (t << double)
+        moves |= t << shift
+
+        t = mask & (own >> shift)
+        t |= mask & (t >> shift)
+        pre = mask & (mask >> shift)
+        t |= pre & (t >> double)
+        t |= pre & (t >> double)
+        moves |= t >> shift
+    return moves & empty
+
+
+def _build_move_mask(size):
+    """Return a `move_mask` for size x size bitboards, with its masks and shift counts bound in."""
+    full = (1 << size * size) - 1
+    left_file = sum(1 << row * size for row in range(size))
+    not_edge_files = full & ~(left_file | left_file << (size - 1))
+    doublings = max(0, (size - 3) // 2)  # Runs of up to size - 2 discs: 2 single steps, then 2 at a time
+    shifts = (1, size, size - 1, size + 1)
+
+    def sized_move_mask(own, opp):
+        empty = ~(own | opp) & full
+        inner = opp & not_edge_files
+        moves = 0
+        for shift, mask in zip(shifts, (inner, opp, inner, inner)):
+            double = shift + shift
+
+            t = mask & (own << shift)
+            t |= mask & (t << shift)
+            pre = mask & (mask << shift)
+            for _ in range(doublings):
+                t |= pre & (t << double)
+            moves |= t << shift
+
+            t = mask & (own >> shift)
+            t |= mask & (t >> shift)
+            pre = mask & (mask >> shift)
+            for _ in range(doublings):
+                t |= pre & (t >> double)
+            moves |= t >> shift
+        return moves & empty
+    return sized_move_mask
+
+
+def flip_mask(own, opp, sq, rays=RAYS):
+    """Return the bitmask of `opp` discs flipped when `own` plays on square index `sq`.
+
+    `rays` is the board size's table (BoardTables.rays); the default is the 8x8 one.
+    """
+    flips = 0
+    for ray in rays[sq]:
+        run = 0
+        for bit in ray:
+            if opp & bit:
+                run |= bit
+            else:
+                if own & bit:
+                    flips |= run
+                break
+    return flips
+
+
+SQUARES = {1 << sq: divmod(sq, 8) for sq in range(64)}
+
+
+def mask_to_moves(mask, squares=SQUARES):
+    """Convert a move bitmask into a list of (row, col) tuples in row-major order.
+
+    `squares` maps bits to squares for the board size (BoardTables.squares); the default is 8x8.
+    """
+    moves = []
+    while mask:
+        low = mask & -mask
+        moves.append(squares[low])
+        mask ^= low
+    return moves
+
+
+class BoardTables:
+    __slots__ = ("size", "square_count", "corner_mask", "square_weights", "weight_classes",
+                 "rays", "squares", "zobrist_black", "zobrist_white", "zobrist_flip", "move_mask")
+    _cache = {}  # Size -> tables, so each size is built once per process
+
+    def __init__(self, size):
+        """Precomputed tables for a size x size board, so move generation and evaluation need
+        no bounds checks. Use `for_size` to share them.
+        """
+        if size < 4 or size > 26 or size % 2:
+            raise ValueError(f"board size must be an even number from 4 to 26, not {size}")
+        self.size = size
+        self.square_count = size * size
+        last = size - 1
+        self.corner_mask = 1 | 1 << last | 1 << (last * size) | 1 << (last * size + last)
+        if size == 8:  # The module-level tables and the hand-unrolled move generator
+            self.square_weights = SQUARE_WEIGHTS
+            self.weight_classes = WEIGHT_CLASSES
+            self.rays = RAYS
+            self.squares = SQUARES
+            self.zobrist_black, self.zobrist_white, self.zobrist_flip = ZOBRIST_BLACK, ZOBRIST_WHITE, ZOBRIST_FLIP
+            self.move_mask = move_mask
+        else:
+            self.square_weights = _build_square_weights(size)
+            self.weight_classes = _build_weight_classes(self.square_weights)
+            self.rays = _build_rays(size)
+            self.squares = {1 << sq: divmod(sq, size) for sq in range(self.square_count)}
+            self.zobrist_black, self.zobrist_white, self.zobrist_flip, _ = _build_zobrist(size)
+            self.move_mask = _build_move_mask(size)
+
+    @classmethod
+    def for_size(cls, size):
+        """Return the process-wide tables for `size`."""
+        tables = cls._cache.get(size)
+        if tables is None:
+            tables = cls._cache[size] = cls(size)
+        return tables
+
+
+def move_to_notation(move):
+    """Convert a (row, col) move to standard notation such as 'd3'."""
+    row, col = move
+    return f"{chr(col + ord('a'))}{row + 1}"
+
+
+def notation_to_move(text):
+    """Convert standard notation such as 'd3' back to a (row, col) move."""
+    return int(text[1:]) - 1, ord(text[0].lower()) - ord('a')
+
+
+def position_from_moves(moves, size=8):
+    """Replay standard-notation moves from the initial position (passes implied) and return the game."""
+    game = Othello(size)
+    for text in moves:
+        player = game.current_player
+        if not game.move_mask(player):  # Forced pass
+            player = game.current_player = 'O' if player == 'X' else 'X'
+        game.make_move(*notation_to_move(text), player)
+        game.current_player = 'O' if player == 'X' else 'X'
+    return game
+
+
 class Othello:
-    def __init__(self):
-        """Initialize the Othello board and set the starting player."""
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+    def __init__(self, size=8):
+        """Initialize a size x size Othello board (8x8 by default) and set the starting player."""
+        self.size = size
+        self.tables = BoardTables.for_size(size)
+        self.black = 0  # Bitboard of 'X' discs, bit index = row * size + col
+        self.white = 0  # Bitboard of 'O' discs
+        self.hash = 0  # Zobrist hash of the discs, maintained by make_move/undo_move
+        self.patterns = None  # Optional PatternEval.PatternState, kept in step once attached
         self.initialize_board()
         self.current_player = 'X'
 
     def initialize_board(self):
         """Set up the initial board configuration."""
-        self.board[3][3], self.board[3][4] = 'O', 'X'
-        self.board[4][3], self.board[4][4] = 'X', 'O'
+        size, low, high = self.size, self.size // 2 - 1, self.size // 2
+        self.black = 1 << (low * size + high) | 1 << (high * size + low)
+        self.white = 1 << (low * size + low) | 1 << (high * size + high)
+        self.hash = self._zobrist_hash()
+        if self.patterns is not None:
+            self.patterns.reset(self.black, self.white)
 
-    def print_board(self):
-        """Print the current state of the board with better visualization."""
-        print("\n    a   b   c   d   e   f   g   h")
-        print("  +---+---+---+---+---+---+---+---+")
-        for i in range(8):
-            row = f"{i+1} | " + " | ".join(self.board[i]) + " |"
-            print(row)
-            print("  +---+---+---+---+---+---+---+---+")
-    def __init__(self):
-        """Initialize the Othello board and set the starting player."""
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
-        self.initialize_board()
-        self.current_player = 'X'
+    @property
+    def board(self):
+        """Return the board as a size x size list of '.', 'X' and 'O' characters."""
+        board = []
+        size = self.size
+        for row in range(size):
+            cells = []
+            for col in range(size):
+                bit = 1 << (row * size + col)
+                cells.append('X' if self.black & bit else 'O' if self.white & bit else '.')
+            board.append(cells)
+        return board
 
-    def initialize_board(self):
-        """Set up the initial board configuration."""
-        self.board[3][3], self.board[3][4] = 'O', 'X'
-        self.board[4][3], self.board[4][4] = 'X', 'O'
+    @board.setter
+    def board(self, rows):
+        """Load the position from a size x size grid of '.', 'X' and 'O' characters."""
+        self.black = self.white = 0
+        size = self.size
+        for row in range(size):
+            for col in range(size):
+                if rows[row][col] == 'X':
+                    self.black |= 1 << (row * size + col)
+                elif rows[row][col] == 'O':
+                    self.white |= 1 << (row * size + col)
+        self.hash = self._zobrist_hash()
+        if self.patterns is not None:
+            self.patterns.reset(self.black, self.white)
+
+    def _zobrist_hash(self):
+        """Compute the Zobrist hash of the discs from scratch with this board size's keys."""
+        if self.size == 8:
+            return zobrist_hash(self.black, self.white)
+        tables, h = self.tables, 0
+        for bits, keys in ((self.black, tables.zobrist_black), (self.white, tables.zobrist_white)):
+            while bits:
+                low = bits & -bits
+                h ^= keys[low]
+                bits ^= low
+        return h
 
     def print_board(self):
         """Print the current state of the board."""
-        print("  a b c d e f g h")
-        for i in range(8):
-            print(f"{i+1} " + " ".join(self.board[i]))
+        width = len(str(self.size))  # Row labels line up on boards of 10 rows or more
+        print(" " * (width + 1) + " ".join(chr(ord('a') + col) for col in range(self.size)))
+        for i, row in enumerate(self.board):
+            print(f"{i+1:>{width}} " + " ".join(row))
+
+    def discs(self, player):
+        """Return the (own, opponent) bitboards from `player`'s point of view."""
+        if player == 'X':
+            return self.black, self.white
+        return self.white, self.black
+
+    def snapshot(self):
+        """Return an opaque copy of the position that `restore` can reinstate."""
+        return self.black, self.white, self.hash
+
+    def position(self):
+        """Return the position and side to move as a compact, immutable `Position` (8x8 only)."""
+        if self.size != 8:
+            raise ValueError("Position only holds 8x8 boards")
+        return Position(self.black, self.white, self.current_player)
+
+    def load_position(self, position):
+        """Set the board and side to move from a `Position` (8x8 only)."""
+        if self.size != 8:
+            raise ValueError("Position only holds 8x8 boards")
+        self.black, self.white = position.black, position.white
+        self.current_player = position.player
+        self.hash = zobrist_hash(self.black, self.white)
+        if self.patterns is not None:
+            self.patterns.reset(self.black, self.white)
+
+    def restore(self, snapshot):
+        """Reinstate a position captured by `snapshot`."""
+        self.black, self.white, self.hash = snapshot
+        if self.patterns is not None:
+            self.patterns.reset(self.black, self.white)
+
+    def positional_score(self, player):
+        """Return the square weights (SQUARE_WEIGHTS on 8x8) under `player`'s discs minus the opponent's."""
+        own, opp = self.discs(player)
+        score = 0
+        for weight, mask in self.tables.weight_classes:
+            score += weight * ((own & mask).bit_count() - (opp & mask).bit_count())
+        return score
+
+    def position_key(self, player):
+        """Return the Zobrist key of the position with `player` to move."""
+        return self.hash ^ ZOBRIST_SIDE if player == 'O' else self.hash
+
+    def move_mask(self, player):
+        """Return the bitmask of valid moves for `player`."""
+        if player == 'X':
+            return self.tables.move_mask(self.black, self.white)
+        return self.tables.move_mask(self.white, self.black)
 
     def valid_moves(self, player):
         """Return a list of valid moves for the current player."""
-        opponent = 'O' if player == 'X' else 'X'
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        moves = []
-
-        for row in range(8):
-            for col in range(8):
-                if self.board[row][col] != '.':
-                    continue
-                for dr, dc in directions:
-                    r, c = row + dr, col + dc
-                    if 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == opponent:
-                        while 0 <= r < 8 and 0 <= c < 8:
-                            r += dr
-                            c += dc
-                            if not (0 <= r < 8 and 0 <= c < 8):
-                                break
-                            if self.board[r][c] == '.':
-                                break
-                            if self.board[r][c] == player:
-                                moves.append((row, col))
-                                break
-        return moves
+        return mask_to_moves(self.move_mask(player), self.tables.squares)
 
     def make_move(self, row, col, player):
-        """Execute a move and flip the opponent's pieces as necessary."""
-        opponent = 'O' if player == 'X' else 'X'
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        """Execute a move, flip the opponent's pieces and return the flipped bitmask."""
+        tables = self.tables
+        sq = row * self.size + col
+        bit = 1 << sq
+        if player == 'X':
+            flips = flip_mask(self.black, self.white, sq, tables.rays)
+            self.black |= bit | flips
+            self.white ^= flips
+            self.hash ^= tables.zobrist_black[bit] ^ self._flip_hash(flips)
+        else:
+            flips = flip_mask(self.white, self.black, sq, tables.rays)
+            self.white |= bit | flips
+            self.black ^= flips
+            self.hash ^= tables.zobrist_white[bit] ^ self._flip_hash(flips)
+        if self.patterns is not None:
+            self.patterns.play(bit, flips, player)
+        return flips
 
-        self.board[row][col] = player
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            flips = []
-            while 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == opponent:
-                flips.append((r, c))
-                r += dr
-                c += dc
-            if 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == player:
-                for rr, cc in flips:
-                    self.board[rr][cc] = player
+    def undo_move(self, row, col, player, flips):
+        """Take back a move made by `make_move`, given the bitmask it returned."""
+        bit = 1 << (row * self.size + col)
+        if player == 'X':
+            self.black ^= bit | flips
+            self.white |= flips
+            self.hash ^= self.tables.zobrist_black[bit] ^ self._flip_hash(flips)
+        else:
+            self.white ^= bit | flips
+            self.black |= flips
+            self.hash ^= self.tables.zobrist_white[bit] ^ self._flip_hash(flips)
+        if self.patterns is not None:
+            self.patterns.undo(bit, flips, player)
+
+    def _flip_hash(self, flips):
+        """Return the Zobrist delta for toggling the colour of every disc in `flips`."""
+        keys = self.tables.zobrist_flip
+        h = 0
+        while flips:
+            low = flips & -flips
+            h ^= keys[low]
+            flips ^= low
+        return h
 
     def is_game_over(self):
         """Check if the game is over (no valid moves for either player)."""
-        return not self.valid_moves('X') and not self.valid_moves('O')
+        move_mask = self.tables.move_mask
+        return not move_mask(self.black, self.white) and not move_mask(self.white, self.black)
+
+    def empties(self):
+        """Return the number of empty squares."""
+        return self.tables.square_count - (self.black | self.white).bit_count()
 
     def count_discs(self):
         """Count the number of discs for each player."""
-        black, white = 0, 0
-        for row in self.board:
-            black += row.count('X')
-            white += row.count('O')
-        return black, white
\ No newline at end of file
+        return self.black.bit_count(), self.white.bit_count()
+
+
+class Position:
+    """An immutable, hashable position: both bitboards and the side to move packed into one int.
+
+    Costs well under 100 bytes, against a few hundred for an `Othello` game, so millions can
+    be held at once (search trees, replay buffers, game logs). Copies share the same object.
+    """
+    __slots__ = ("_bits",)  # black | white << 64 | (1 << 128 when 'O' is to move)
+    SIZE = 17  # Bytes per serialised position: black and white little-endian, then the side
+
+    def __init__(self, black, white, player='X'):
+        if black & white or not 0 <= black <= FULL_MASK or not 0 <= white <= FULL_MASK:
+            raise ValueError("black and white must be disjoint 64-bit bitboards")
+        object.__setattr__(self, "_bits", black | white << 64 | (player == 'O') << 128)
+
+    @classmethod
+    def _from_bits(cls, bits):
+        position = object.__new__(cls)
+        object.__setattr__(position, "_bits", bits)
+        return position
+
+    @classmethod
+    def from_game(cls, game):
+        """Capture the position and side to move of an `Othello` game."""
+        return cls(game.black, game.white, game.current_player)
+
+    @classmethod
+    def from_board(cls, rows, player='X'):
+        """Build a position from an 8x8 grid of '.', 'X' and 'O' characters."""
+        game = Othello()
+        game.board = rows
+        return cls(game.black, game.white, player)
+
+    def to_game(self):
+        """Return a new `Othello` game set to this position."""
+        game = Othello()
+        game.load_position(self)
+        return game
+
+    @property
+    def black(self):
+        return self._bits & FULL_MASK
+
+    @property
+    def white(self):
+        return self._bits >> 64 & FULL_MASK
+
+    @property
+    def player(self):
+        """The side to move, 'X' or 'O'."""
+        return 'O' if self._bits >> 128 else 'X'
+
+    @property
+    def board(self):
+        """Return the board as an 8x8 list of '.', 'X' and 'O' characters."""
+        black, white = self.black, self.white
+        return [['X' if black & square_bit(row, col) else 'O' if white & square_bit(row, col) else '.'
+                 for col in range(8)] for row in range(8)]
+
+    def valid_moves(self):
+        """Return the side to move's valid moves as (row, col) tuples."""
+        black, white = self.black, self.white
+        if self.player == 'X':
+            return mask_to_moves(move_mask(black, white))
+        return mask_to_moves(move_mask(white, black))
+
+    def play(self, row, col):
+        """Return the position after the side to move plays (row, col), with the turn passed over."""
+        sq = row * 8 + col
+        black, white = self.black, self.white
+        if self.player == 'X':
+            flips = flip_mask(black, white, sq)
+            return Position(black | 1 << sq | flips, white ^ flips, 'O')
+        flips = flip_mask(white, black, sq)
+        return Position(black ^ flips, white | 1 << sq | flips, 'X')
+
+    def to_bytes(self):
+        """Serialise to SIZE bytes."""
+        return self._bits.to_bytes(self.SIZE, "little")
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Read a position written by `to_bytes`."""
+        if len(data) != cls.SIZE or data[-1] > 1:
+            raise ValueError(f"expected {cls.SIZE} bytes of a serialised position")
+        bits = int.from_bytes(data, "little")
+        if bits & bits >> 64 & FULL_MASK:
+            raise ValueError("serialised position has squares that are both black and white")
+        return cls._from_bits(bits)
+
+    @classmethod
+    def pack(cls, positions):
+        """Serialise many positions into one bytes object."""
+        return b"".join(position._bits.to_bytes(cls.SIZE, "little") for position in positions)
+
+    @classmethod
+    def unpack(cls, data):
+        """Yield the positions of a buffer written by `pack`."""
+        view = memoryview(data)
+        if len(view) % cls.SIZE:
+            raise ValueError(f"buffer length is not a multiple of {cls.SIZE}")
+        for offset in range(0, len(view), cls.SIZE):
+            yield cls.from_bytes(view[offset:offset + cls.SIZE])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self._bits == other._bits
+
+    def __hash__(self):
+        return hash(self._bits)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return Position._from_bits, (self._bits,)
+
+    def __repr__(self):
+        return f"Position(0x{self.black:016x}, 0x{self.white:016x}, {self.player!r})"
@@ -0,0 +1,195 @@
+import os
+import struct
+import zlib
+from array import array
+from Othello import SQUARE_WEIGHTS, square_bit
+
+MAGIC = b"OTHPAT01"
+HEADER = struct.Struct("<8sHH4x")  # Magic, stage count, pattern type count, padding to 16 bytes
+SCORE_SCALE = 16  # Table units per disc
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patterns.bin")
+
+# Pattern types as (row, col) squares of one instance; the other instances are its
+# images under the 8 board symmetries and share the same table.
+PATTERN_TYPES = (
+    ("edge_x", [(0, c) for c in range(8)] + [(1, 1), (1, 6)]),
+    ("corner3x3", [(r, c) for r in range(3) for c in range(3)]),
+    ("corner2x5", [(r, c) for r in range(2) for c in range(5)]),
+    ("line2", [(1, c) for c in range(8)]),
+    ("line3", [(2, c) for c in range(8)]),
+    ("line4", [(3, c) for c in range(8)]),
+    ("diag8", [(i, i) for i in range(8)]),
+    ("diag7", [(i, i + 1) for i in range(7)]),
+    ("diag6", [(i, i + 2) for i in range(6)]),
+    ("diag5", [(i, i + 3) for i in range(5)]),
+    ("diag4", [(i, i + 4) for i in range(4)]),
+)
+
+
+def _build_instances():
+    """Return (type index, squares) for every distinct symmetric image of every pattern type."""
+    instances = []
+    for type_index, (_, squares) in enumerate(PATTERN_TYPES):
+        seen = set()
+        for symmetry in range(8):
+            image = []
+            for row, col in squares:
+                if symmetry & 1:
+                    row, col = col, row
+                if symmetry & 2:
+                    row = 7 - row
+                if symmetry & 4:
+                    col = 7 - col
+                image.append(row * 8 + col)
+            if frozenset(image) not in seen:  # Symmetric patterns map onto themselves
+                seen.add(frozenset(image))
+                instances.append((type_index, tuple(image)))
+    return tuple(instances)
+
+
+def _build_square_patterns():
+    """Map every square's bit to the (instance, power of 3) pairs of the patterns it belongs to."""
+    square_patterns = {square_bit(*divmod(sq, 8)): [] for sq in range(64)}
+    for index, (_, squares) in enumerate(INSTANCES):
+        for position, sq in enumerate(squares):
+            square_patterns[1 << sq].append((index, 3 ** position))
+    return {bit: tuple(pairs) for bit, pairs in square_patterns.items()}
+
+
+INSTANCES = _build_instances()
+SQUARE_PATTERNS = _build_square_patterns()
+TABLE_SIZES = tuple(3 ** len(squares) for _, squares in PATTERN_TYPES)
+
+
+def pattern_codes(black, white):
+    """Compute every instance's base-3 code from scratch (digit 0 empty, 1 black, 2 white)."""
+    codes = []
+    for _, squares in INSTANCES:
+        code = 0
+        for sq in reversed(squares):
+            code = code * 3 + (1 if black >> sq & 1 else 2 if white >> sq & 1 else 0)
+        codes.append(code)
+    return codes
+
+
+class PatternState:
+    def __init__(self, black, white):
+        """Pattern codes of a position, kept in step by Othello.make_move/undo_move once attached."""
+        self.codes = pattern_codes(black, white)
+
+    def reset(self, black, white):
+        """Recompute the codes after the position was replaced wholesale."""
+        self.codes = pattern_codes(black, white)
+
+    def play(self, bit, flips, player):
+        """Update the codes for `player` placing a disc on `bit` and flipping `flips`."""
+        if player == 'X':
+            self._apply(bit, flips, 1, -1)  # Flipped discs go from digit 2 to 1
+        else:
+            self._apply(bit, flips, 2, 1)
+
+    def undo(self, bit, flips, player):
+        """Reverse `play`."""
+        if player == 'X':
+            self._apply(bit, flips, -1, 1)
+        else:
+            self._apply(bit, flips, -2, -1)
+
+    def _apply(self, bit, flips, placed, flipped):
+        codes = self.codes
+        for index, power in SQUARE_PATTERNS[bit]:
+            codes[index] += placed * power
+        while flips:
+            low = flips & -flips
+            for index, power in SQUARE_PATTERNS[low]:
+                codes[index] += flipped * power
+            flips ^= low
+
+
+class PatternWeights:
+    _loaded = {}  # Path -> weights, so each process reads a file once
+
+    def __init__(self, stages):
+        """Pattern tables for each game stage: `stages[s][t]` is an array of int16 scores
+        (in 1/SCORE_SCALE discs, for black) indexed by the code of pattern type t.
+        """
+        self.stages = stages
+        # Per stage, each instance's table in INSTANCES order as a list (faster to index than an
+        # array), with equal values sharing one int object so a table costs ~8 bytes per entry.
+        interned = {}
+        self._instance_tables = []
+        for tables in stages:
+            lists = [[interned.setdefault(value, value) for value in table] for table in tables]
+            self._instance_tables.append(tuple(lists[type_index] for type_index, _ in INSTANCES))
+
+    @classmethod
+    def load(cls, path=None):
+        """Return the process-wide weights for `path` (default: patterns.bin next to this module).
+
+        Falls back to `default()` when the default file does not exist.
+        """
+        path = path or DEFAULT_PATH
+        weights = cls._loaded.get(path)
+        if weights is None:
+            if path == DEFAULT_PATH and not os.path.exists(path):
+                weights = cls.default()
+            else:
+                weights = cls.read(path)
+            cls._loaded[path] = weights
+        return weights
+
+    @classmethod
+    def read(cls, path):
+        """Read a weights file written by `write`."""
+        with open(path, "rb") as f:
+            magic, stage_count, type_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or type_count != len(PATTERN_TYPES):
+                raise ValueError(f"{path} is not a pattern weights file for this engine")
+            values = array("h")
+            values.frombytes(zlib.decompress(f.read()))
+        stages, offset = [], 0
+        for _ in range(stage_count):
+            tables = []
+            for size in TABLE_SIZES:
+                tables.append(values[offset:offset + size])
+                offset += size
+            stages.append(tables)
+        return cls(stages)
+
+    def write(self, path):
+        """Write the tables as a 16-byte header and zlib-compressed little-endian int16 values."""
+        values = array("h")
+        for tables in self.stages:
+            for table in tables:
+                values.extend(table)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.stages), len(PATTERN_TYPES)))
+            f.write(zlib.compress(values.tobytes(), 9))
+
+    @classmethod
+    def default(cls):
+        """Single-stage tables that spread SQUARE_WEIGHTS over the patterns covering each square,
+        so the pattern score is the weighted-square score in 1/SCORE_SCALE units (to within
+        rounding), on the same scale as trained tables, until trained weights exist.
+        """
+        coverage = [0] * 64
+        for _, squares in INSTANCES:
+            for sq in squares:
+                coverage[sq] += 1
+        tables = []
+        for _, squares in PATTERN_TYPES:
+            values = [0.0]
+            for row, col in reversed(squares):  # Code = d0 + 3 * (code of the remaining squares)
+                weight = SQUARE_WEIGHTS[row][col] * SCORE_SCALE / coverage[row * 8 + col]
+                values = [rest + digit for rest in values for digit in (0.0, weight, -weight)]
+            tables.append(array("h", (round(value) for value in values)))
+        return cls([tables])
+
+    def stage(self, discs):
+        """Return the stage index used for a position with `discs` discs on the board."""
+        return (discs - 4) * len(self.stages) // 61
+
+    def score(self, codes, discs):
+        """Return the pattern score for black of a position with these codes and disc count."""
+        tables = self._instance_tables[self.stage(discs)]
+        return sum(map(list.__getitem__, tables, codes))
@@ -0,0 +1,78 @@
+import time
+from Othello import move_to_notation
+
+
+class SearchStats:
+    def __init__(self):
+        """Counters and timings for one AIPlayer search."""
+        self.nodes = 0
+        self.depth = 0
+        self.seconds = 0.0
+        self.score = None
+        self.move = None
+        self.nodes_per_depth = {}
+        self.cutoffs_per_ply = {}
+        self.call_counts = {}  # Instrumented function name -> number of calls
+        self.call_times = {}  # Instrumented function name -> total seconds
+        self.principal_variation = []
+
+    def timed(self, func, name):
+        """Wrap `func` so its calls and running time are recorded under `name`."""
+        counts, times = self.call_counts, self.call_times
+        counts.setdefault(name, 0)
+        times.setdefault(name, 0.0)
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            start = clock()
+            result = func(*args)
+            times[name] += clock() - start
+            counts[name] += 1
+            return result
+        return wrapper
+
+    def record_cutoff(self, ply):
+        """Count a beta cutoff at `ply`."""
+        self.cutoffs_per_ply[ply] = self.cutoffs_per_ply.get(ply, 0) + 1
+
+    @property
+    def leaf_evaluations(self):
+        """Number of positions passed to the evaluation function."""
+        return self.call_counts.get("evaluate", 0)
+
+    @property
+    def effective_branching_factor(self):
+        """Growth in nodes from the previous completed depth, or the depth-th root of the node count."""
+        if self.depth - 1 in self.nodes_per_depth and self.nodes_per_depth[self.depth - 1]:
+            return self.nodes_per_depth.get(self.depth, 0) / self.nodes_per_depth[self.depth - 1]
+        return self.nodes ** (1 / self.depth) if self.depth else 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        """Return the statistics as a JSON-friendly dictionary."""
+        return {
+            "score": self.score,
+            "move": self.move,
+            "depth": self.depth,
+            "seconds": self.seconds,
+            "nodes": self.nodes,
+            "nodes_per_second": self.nodes_per_second,
+            "leaf_evaluations": self.leaf_evaluations,
+            "effective_branching_factor": self.effective_branching_factor,
+            "nodes_per_depth": dict(self.nodes_per_depth),
+            "cutoffs_per_ply": dict(self.cutoffs_per_ply),
+            "call_counts": dict(self.call_counts),
+            "call_times": dict(self.call_times),
+            "principal_variation": list(self.principal_variation),
+        }
+
+    def summary(self):
+        """Return a one-line human-readable summary."""
+        times = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.call_times.items())
+        pv = " ".join(move_to_notation(move) for move in self.principal_variation)
+        return (f"depth {self.depth}, {self.nodes} nodes in {self.seconds:.3f}s "
+                f"({self.nodes_per_second:,.0f} nodes/s), {self.leaf_evaluations} evals, "
+                f"EBF {self.effective_branching_factor:.2f}, {times}, PV {pv}")
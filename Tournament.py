@@ -0,0 +1,130 @@
+import argparse
+import csv
+import itertools
+import json
+import time
+from multiprocessing import Pool
+from Othello import Othello, move_to_notation
+from AIplayer import AIPlayer
+
+CSV_FIELDS = ["game", "seed", "size", "black", "white", "black_discs", "white_discs", "winner", "moves", "move_times_ms"]
+
+
+def config_label(config):
+    """Return a short name for an AI configuration, e.g. 'd3h1', 'd3h1t500' or 'd3h1e12'."""
+    label = f"d{config['depth']}h{config['heuristic']}"
+    if config.get("time_limit_ms"):
+        label += f"t{config['time_limit_ms']}"
+    if config.get("endgame_empties"):
+        label += f"e{config['endgame_empties']}"
+    return label
+
+
+def build_schedule(configs, games_per_pair, seed=0, size=8):
+    """Pair every two configurations for `games_per_pair` games on a size x size board, alternating colours."""
+    schedule = []
+    for first, second in itertools.combinations(configs, 2):
+        for i in range(games_per_pair):
+            black, white = (first, second) if i % 2 == 0 else (second, first)
+            game_id = len(schedule)
+            schedule.append({"game": game_id, "seed": seed + game_id, "black": black, "white": white,
+                             "size": size})
+    return schedule
+
+
+def play_game(job):
+    """Play one AI vs. AI game without any display and return its result record."""
+    size = job.get("size", 8)
+    game = Othello(size)
+    players = {
+        'X': AIPlayer(seed=job["seed"], **job["black"]),
+        'O': AIPlayer(seed=job["seed"] + 1, **job["white"]),
+    }
+    moves, move_times = [], []
+    while not game.is_game_over():
+        player = game.current_player
+        if game.move_mask(player):
+            start = time.perf_counter()
+            _, move = players[player].get_move(game, player)
+            move_times.append(round((time.perf_counter() - start) * 1000, 3))
+            game.make_move(*move, player)
+            moves.append(move_to_notation(move))
+        game.current_player = 'O' if player == 'X' else 'X'
+
+    black, white = game.count_discs()
+    return {
+        "game": job["game"],
+        "seed": job["seed"],
+        "size": size,
+        "black": config_label(job["black"]),
+        "white": config_label(job["white"]),
+        "black_discs": black,
+        "white_discs": white,
+        "winner": "black" if black > white else "white" if white > black else "draw",
+        "moves": moves,
+        "move_times_ms": move_times,
+    }
+
+
+def run_tournament(configs, games_per_pair, output, fmt="jsonl", processes=None, seed=0, size=8):
+    """Play the whole schedule in worker processes, streaming each result to `output`.
+
+    Returns a {label: [wins, losses, draws]} summary.
+    """
+    schedule = build_schedule(configs, games_per_pair, seed, size)
+    summary = {config_label(config): [0, 0, 0] for config in configs}
+    with open(output, "w", newline="") as f, Pool(processes) as pool:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+        for result in pool.imap_unordered(play_game, schedule):
+            if writer:
+                writer.writerow(dict(result, moves=" ".join(result["moves"]),
+                                     move_times_ms=" ".join(map(str, result["move_times_ms"]))))
+            else:
+                f.write(json.dumps(result) + "\n")
+            f.flush()
+
+            if result["winner"] == "draw":
+                summary[result["black"]][2] += 1
+                summary[result["white"]][2] += 1
+            else:
+                winner, loser = ("black", "white") if result["winner"] == "black" else ("white", "black")
+                summary[result[winner]][0] += 1
+                summary[result[loser]][1] += 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a headless round-robin tournament between AI configurations.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--heuristics", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--time-limit-ms", type=int, default=None, help="Per-move budget (iterative deepening)")
+    parser.add_argument("--endgame-empties", type=int, default=0,
+                        help="Solve positions with this many empties exactly (default 0: off, so "
+                             "the heuristics decide the whole game)")
+    parser.add_argument("--book", help="Opening book file shared by every AI (see OpeningBook.py)")
+    parser.add_argument("--size", type=int, default=8, choices=range(4, 27, 2), metavar="SIZE",
+                        help="Board size, an even number from 4 to 26")
+    parser.add_argument("--games", type=int, default=10, help="Games per pairing; colours alternate")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="tournament.jsonl")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                        help="Output format (default: from the file extension)")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    configs = [{"depth": depth, "heuristic": heuristic, "time_limit_ms": args.time_limit_ms,
+                "endgame_empties": args.endgame_empties, "book": args.book}
+               for depth, heuristic in itertools.product(args.depths, args.heuristics)]
+    start = time.perf_counter()
+    summary = run_tournament(configs, args.games, args.output, fmt, args.processes, args.seed, args.size)
+    print(f"Finished in {time.perf_counter() - start:.1f}s, results written to {args.output}")
+    for label, (wins, losses, draws) in sorted(summary.items(), key=lambda item: -item[1][0]):
+        print(f"{label:>12}: {wins} wins, {losses} losses, {draws} draws")
+
+
+if __name__ == "__main__":
+    main()
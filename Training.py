@@ -0,0 +1,239 @@
+import argparse
+import itertools
+import os
+import random
+import struct
+import time
+from array import array
+from multiprocessing import Pool
+import numpy as np
+from Othello import Othello
+from AIplayer import AIPlayer
+from BatchEval import popcount
+from PatternEval import INSTANCES, TABLE_SIZES, SCORE_SCALE, PatternWeights
+
+# Dataset file: a 16-byte header, then chunks of up to CHUNK_POSITIONS records, each
+# chunk prefixed by its record count so a reader can stream or skip it.
+MAGIC = b"OTHDATA1"
+HEADER = struct.Struct("<8s8x")
+CHUNK_HEADER = struct.Struct("<I")
+RECORD = np.dtype([("black", "<u8"), ("white", "<u8"), ("result", "i1")])  # 17 bytes; result = final black - white
+CHUNK_POSITIONS = 65536
+
+# Flat feature index of each pattern instance's table within one stage.
+TYPE_OFFSETS = np.cumsum((0,) + TABLE_SIZES[:-1])
+STAGE_FEATURES = sum(TABLE_SIZES)
+
+
+def play_selfplay(job):
+    """Play one self-play game and return ([(black, white), ...] for every position, final black - white).
+
+    The first `random_plies` moves are random so that games do not all follow the same line.
+    """
+    rng = random.Random(job["seed"])
+    ai = AIPlayer(job["depth"], job["heuristic"], tt_size_mb=4, seed=job["seed"])
+    game, player, positions = Othello(), 'X', []
+    while not game.is_game_over():
+        if game.move_mask(player):
+            positions.append((game.black, game.white))
+            if len(positions) <= job["random_plies"]:
+                move = rng.choice(game.valid_moves(player))
+            else:
+                _, move = ai.get_move(game, player)
+            game.make_move(*move, player)
+        player = 'O' if player == 'X' else 'X'
+    positions.append((game.black, game.white))
+    black, white = game.count_discs()
+    return positions, black - white
+
+
+class DatasetWriter:
+    def __init__(self, path):
+        """Append (black, white, result) records to a new dataset file, one chunk at a time."""
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC))
+        self.buffer = []
+        self.count = 0
+
+    def add_game(self, positions, result):
+        """Buffer every position of a finished game, labelled with its final disc difference."""
+        self.buffer.extend((black, white, result) for black, white in positions)
+        if len(self.buffer) >= CHUNK_POSITIONS:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records as one chunk."""
+        if self.buffer:
+            records = np.array(self.buffer, dtype=RECORD)
+            self.file.write(CHUNK_HEADER.pack(len(records)))
+            self.file.write(records.tobytes())
+            self.count += len(records)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def chunk_offsets(path):
+    """Return (file offset, record count) of every chunk, reading only the chunk headers."""
+    offsets = []
+    with open(path, "rb") as f:
+        if HEADER.unpack(f.read(HEADER.size))[0] != MAGIC:
+            raise ValueError(f"{path} is not a self-play dataset")
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                return offsets
+            count, = CHUNK_HEADER.unpack(header)
+            offsets.append((f.tell(), count))
+            f.seek(count * RECORD.itemsize, 1)
+
+
+def read_chunk(path, offset, count):
+    """Read one chunk's records as a NumPy structured array."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return np.frombuffer(f.read(count * RECORD.itemsize), dtype=RECORD)
+
+
+def iter_chunks(path):
+    """Yield the dataset one chunk at a time, so it never has to fit in memory."""
+    for offset, count in chunk_offsets(path):
+        yield read_chunk(path, offset, count)
+
+
+def generate(output, games, depth, heuristic, random_plies=8, processes=None, seed=0):
+    """Play `games` self-play games in worker processes, streaming positions to `output`."""
+    jobs = ({"seed": seed + i, "depth": depth, "heuristic": heuristic, "random_plies": random_plies}
+            for i in range(games))
+    with DatasetWriter(output) as writer, Pool(processes) as pool:
+        for positions, result in pool.imap_unordered(play_selfplay, jobs, chunksize=4):
+            writer.add_game(positions, result)
+    return writer.count
+
+
+def feature_indices(records, stages):
+    """Return the flat weight index of every pattern instance of every record, shape (N, 46).
+
+    Index = stage * STAGE_FEATURES + offset of the instance's pattern type + its base-3 code,
+    using the same codes as PatternEval.pattern_codes and the same stages as PatternWeights.
+    """
+    black, white = records["black"], records["white"]
+    squares = np.arange(64, dtype=np.uint64)
+    digits = (((black[:, None] >> squares) & np.uint64(1))
+              + 2 * ((white[:, None] >> squares) & np.uint64(1))).astype(np.int64)
+    discs = popcount(black | white)
+    base = (discs - 4) * stages // 61 * STAGE_FEATURES
+    indices = np.empty((len(records), len(INSTANCES)), dtype=np.int64)
+    for i, (type_index, instance_squares) in enumerate(INSTANCES):
+        powers = 3 ** np.arange(len(instance_squares), dtype=np.int64)
+        indices[:, i] = digits[:, list(instance_squares)] @ powers + TYPE_OFFSETS[type_index] + base
+    return indices
+
+
+def _chunk_features(task):
+    """Worker entry point: read one chunk and return (feature indices, results)."""
+    path, offset, count, stages = task
+    records = read_chunk(path, offset, count)
+    return feature_indices(records, stages), records["result"].astype(np.float64)
+
+
+def _featurised(pool, path, chunks, stages, window):
+    """Yield (feature indices, results) for `chunks`, featurising `window` chunks at a time in `pool`."""
+    for first in range(0, len(chunks), window):
+        tasks = [(path, offset, count, stages) for offset, count in chunks[first:first + window]]
+        yield from pool.imap(_chunk_features, tasks)
+
+
+def fit(path, stages=6, epochs=4, learning_rate=0.02, batch_size=4096, processes=None, seed=0, validation=None):
+    """Fit pattern weights (in discs) to the final results by mini-batch SGD and return them.
+
+    Chunks are featurised in worker processes a few at a time, so memory stays bounded
+    by the pool's window of chunks. Each weight moves by `learning_rate` times the mean
+    error of the positions it appears in, so rarely seen patterns still learn. With a
+    `validation` dataset, its error is reported after every epoch to show overfitting.
+    """
+    weights = np.zeros(stages * STAGE_FEATURES)
+    chunks = chunk_offsets(path)
+    validation_chunks = chunk_offsets(validation) if validation else []
+    rng = np.random.default_rng(seed)
+    window = 2 * (processes or os.cpu_count())  # Chunks in flight at once
+    with Pool(processes) as pool:
+        for epoch in range(epochs):
+            start, total_error, total_count = time.perf_counter(), 0.0, 0
+            shuffled = [chunks[i] for i in rng.permutation(len(chunks))]
+            for indices, results in _featurised(pool, path, shuffled, stages, window):
+                shuffle = rng.permutation(len(results))
+                for batch in np.array_split(shuffle, max(1, len(shuffle) // batch_size)):
+                    batch_indices = indices[batch]
+                    error = results[batch] - weights[batch_indices].sum(axis=1)
+                    flat = batch_indices.ravel()
+                    gradient = np.bincount(flat, np.repeat(error, batch_indices.shape[1]), weights.size)
+                    counts = np.bincount(flat, minlength=weights.size)
+                    weights += learning_rate * gradient / np.maximum(counts, 1)
+                    total_error += np.abs(error).sum()
+                    total_count += len(error)
+            report = f"epoch {epoch + 1}: mean absolute error {total_error / max(total_count, 1):.2f} discs"
+            if validation_chunks:
+                validation_error, validation_count = 0.0, 0
+                for indices, results in _featurised(pool, validation, validation_chunks, stages, window):
+                    validation_error += np.abs(results - weights[indices].sum(axis=1)).sum()
+                    validation_count += len(results)
+                report += f", validation {validation_error / max(validation_count, 1):.2f}"
+            print(f"{report} over {total_count} positions ({time.perf_counter() - start:.1f}s)")
+    return weights.reshape(stages, STAGE_FEATURES)
+
+
+def export_weights(weights, path):
+    """Write fitted weights (in discs) as a PatternEval weights file."""
+    scaled = np.clip(np.rint(weights * SCORE_SCALE), -32768, 32767).astype(np.int16)
+    stages = []
+    for stage in scaled:
+        split = np.split(stage, list(itertools.accumulate(TABLE_SIZES))[:-1])
+        stages.append([array("h", table.tobytes()) for table in split])
+    PatternWeights(stages).write(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate self-play data and fit pattern evaluation weights.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="Play self-play games into a dataset file")
+    gen.add_argument("--games", type=int, default=1000)
+    gen.add_argument("--depth", type=int, default=2)
+    gen.add_argument("--heuristic", type=int, default=4)
+    gen.add_argument("--random-plies", type=int, default=8, help="Random opening moves per game")
+    gen.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--output", default="selfplay.dat")
+
+    fit_parser = commands.add_parser("fit", help="Fit pattern weights to a dataset and export them")
+    fit_parser.add_argument("--data", default="selfplay.dat")
+    fit_parser.add_argument("--stages", type=int, default=6, help="Game stages with separate tables")
+    fit_parser.add_argument("--epochs", type=int, default=4)
+    fit_parser.add_argument("--learning-rate", type=float, default=0.02)
+    fit_parser.add_argument("--validation", help="Held-out dataset whose error is reported after each epoch")
+    fit_parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    fit_parser.add_argument("--output", default="patterns.bin", help="Weights file (heuristic 5 loads patterns.bin by default)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "generate":
+        count = generate(args.output, args.games, args.depth, args.heuristic, args.random_plies, args.processes, args.seed)
+        print(f"Wrote {count} positions from {args.games} games to {args.output} in {time.perf_counter() - start:.1f}s")
+    else:
+        weights = fit(args.data, args.stages, args.epochs, args.learning_rate, processes=args.processes,
+                      validation=args.validation)
+        export_weights(weights, args.output)
+        print(f"Wrote {args.stages}-stage weights to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
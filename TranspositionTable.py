@@ -0,0 +1,72 @@
+EXACT, LOWER, UPPER = 0, 1, 2  # Bound type of a stored score
+ENTRY_BYTES = 136  # Approximate size of one stored entry tuple plus its table slot
+REPLACEMENT_POLICIES = ('depth', 'always')
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16, policy='depth'):
+        """Create a fixed-size table whose entries fit in roughly `size_mb` megabytes.
+
+        `policy` decides what happens when a new entry lands on an occupied slot:
+        'depth' keeps the existing entry if it was searched deeper during the current
+        search, 'always' overwrites it. Entries left by earlier searches (see
+        `new_search`) stay usable but give way to new ones, so the table ages out.
+        """
+        if policy not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy {policy!r}, expected one of {REPLACEMENT_POLICIES}")
+        slots = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.size = 1 << (slots.bit_length() - 1)  # Round down to a power of two for masking
+        self.mask = self.size - 1
+        self.policy = policy
+        self.table = [None] * self.size
+        self.generation = 0  # Search counter stored with each entry
+        self.hits = self.misses = self.collisions = 0
+        self.stores = self.rejected = 0
+
+    def new_search(self):
+        """Start a new search generation; entries from earlier ones become replaceable."""
+        self.generation += 1
+
+    def probe(self, key):
+        """Return the (key, depth, flag, score, move, generation) entry for `key`, or None."""
+        entry = self.table[key & self.mask]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:  # Slot holds a different position
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, score, move):
+        """Record a search result, subject to the replacement policy."""
+        index = key & self.mask
+        old = self.table[index]
+        if (old is not None and self.policy == 'depth' and old[0] != key and old[1] > depth
+                and old[5] == self.generation):
+            self.rejected += 1
+            return
+        self.table[index] = (key, depth, flag, score, move, self.generation)
+        self.stores += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self.table = [None] * self.size
+        self.hits = self.misses = self.collisions = 0
+        self.stores = self.rejected = 0
+
+    def stats(self):
+        """Return the table counters as a dictionary."""
+        probes = self.hits + self.misses + self.collisions
+        return {
+            "size": self.size,
+            "used": self.size - self.table.count(None),
+            "current": sum(1 for entry in self.table if entry is not None and entry[5] == self.generation),
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "rejected": self.rejected,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
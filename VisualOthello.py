@@ -1,83 +1,195 @@
+import argparse
 import pygame
 import sys
+import threading
 import time
 from Othello import Othello
-from AIplayer import AIPlayer
+from AIplayer import AIPlayer, SearchTimeout
+from GameRecord import GameRecord, RecordWriter, move_stats
 
 # Constants
 WINDOW_SIZE = 600
 LOG_WIDTH = 300
-GRID_SIZE = 8
-CELL_SIZE = (WINDOW_SIZE - 50) // GRID_SIZE  # Adjusted for extra label space
 LABEL_SPACE = 50  # Space for row and column labels
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GREEN = (34, 139, 34)
 FPS = 30
+MOVE_DELAY_MS = 500  # Shortest time between moves, so AI moves can be followed
+WINNER_DISPLAY_MS = 3000
+LOG_MOVES = 12  # Moves shown in the move log
+STATUS_HEIGHT = 80  # Strip at the bottom of the log panel showing the AI's search progress
+
+class SearchThread:
+    def __init__(self, ai_player, game, player):
+        """Run `ai_player.get_move` for `player` in a background thread, on a copy of `game`,
+        so the window keeps drawing and handling events while the AI thinks.
+        """
+        self.ai = ai_player
+        self.player = player
+        self.game = Othello(game.size)
+        self.game.restore(game.snapshot())
+        self.game.current_player = player
+        self.result = None  # (move, search stats for the game record) once finished
+        self.error = None  # Exception raised by the search, re-raised by `outcome`
+        self.started = time.perf_counter()
+        ai_player.cancelled = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            score, move = self.ai.get_move(self.game, self.player)
+        except SearchTimeout:
+            return  # Cancelled
+        except Exception as error:
+            self.error = error
+            return
+        self.result = move, move_stats(self.ai, score, time.perf_counter() - self.started)
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def outcome(self):
+        """Return the finished search's (move, stats), raising the error it failed with, if any."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def cancel(self):
+        """Stop the search and wait for the thread to finish."""
+        self.ai.cancel()
+        self.thread.join()
+
+    def status(self):
+        """Return the progress lines shown in the move log panel."""
+        depth, nodes, best = self.ai.progress()
+        seconds = time.perf_counter() - self.started
+        best_text = f", best {best[1][0] + 1}{chr(best[1][1] + ord('a'))}" if best and best[1] else ""
+        return [f"{self.player} thinking: depth {depth}{best_text}",
+                f"{nodes:,} nodes, {nodes / seconds if seconds else 0:,.0f}/s"]
+
 
 class VisualOthelloScreen:
-    def __init__(self):
+    def __init__(self, size=8, record_path=None, ponder=False, show_stats=False):
+        """Open the window for games on a size x size board.
+
+        Finished games are appended to the game record file `record_path`, if given. With
+        `ponder` the AI searches on the human's time; with `show_stats` search statistics
+        are printed after every AI move.
+        """
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_SIZE + LOG_WIDTH, WINDOW_SIZE))
         pygame.display.set_caption("Othello")
         self.clock = pygame.time.Clock()
-        self.game = Othello()
+        self.font = pygame.font.SysFont(None, 30)
+        self.size = size
+        self.cell_size = (WINDOW_SIZE - LABEL_SPACE) // size
+        self.record_path = record_path
+        self.ponder = ponder
+        self.show_stats = show_stats
+        self.game = Othello(size)
         self.move_log = []
+        self.record = GameRecord()  # Appended to record_path when the game ends
         self.cursor_pos = (0, 0)  # Cursor starts at the top-left of the board
+        self.search = None  # SearchThread of the AI move being computed
+        self.drawn_cells = {}  # (row, col) -> (disc, cursor) as currently on screen
+        self.drawn_panel = None  # Lines of the move log panel as currently on screen
+        self.drawn_status = None  # Lines of the search progress strip as currently on screen
+        self.dirty = []  # Screen areas changed since the last display update
 
     def draw_board(self):
-        """Draw the Othello board, discs, and grid labels."""
+        """Draw the whole Othello board, discs, and grid labels."""
         self.screen.fill(GREEN)
-        font = pygame.font.SysFont(None, 30)
 
+        cell = self.cell_size
         # Draw column labels
-        for col in range(GRID_SIZE):
-            label = font.render(chr(col + ord('a')), True, WHITE)
-            self.screen.blit(label, (LABEL_SPACE + col * CELL_SIZE + CELL_SIZE // 2 - 10, LABEL_SPACE // 2 - 10))
+        for col in range(self.size):
+            label = self.font.render(chr(col + ord('a')), True, WHITE)
+            self.screen.blit(label, (LABEL_SPACE + col * cell + cell // 2 - 10, LABEL_SPACE // 2 - 10))
 
         # Draw row labels
-        for row in range(GRID_SIZE):
-            label = font.render(str(row + 1), True, WHITE)
-            self.screen.blit(label, (LABEL_SPACE // 2 - 10, LABEL_SPACE + row * CELL_SIZE + CELL_SIZE // 2 - 10))
-
-        # Draw grid
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                rect = pygame.Rect(LABEL_SPACE + col * CELL_SIZE, LABEL_SPACE + row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(self.screen, BLACK, rect, 1)  # Draw grid lines
-
-                # Highlight the cursor position
-                if self.cursor_pos == (row, col):
-                    pygame.draw.rect(self.screen, WHITE, rect, 2)
-
-                # Draw discs
-                if self.game.board[row][col] == 'X':
-                    pygame.draw.circle(self.screen, BLACK, rect.center, CELL_SIZE // 3)
-                elif self.game.board[row][col] == 'O':
-                    pygame.draw.circle(self.screen, WHITE, rect.center, CELL_SIZE // 3)
+        for row in range(self.size):
+            label = self.font.render(str(row + 1), True, WHITE)
+            self.screen.blit(label, (LABEL_SPACE // 2 - 10, LABEL_SPACE + row * cell + cell // 2 - 10))
+
+        self.drawn_cells = {}
+        self.update_board_cells()
+        self.dirty = [pygame.Rect(0, 0, WINDOW_SIZE, WINDOW_SIZE)]
+
+    def update_board_cells(self):
+        """Redraw only the cells whose disc or cursor highlight changed since they were drawn."""
+        board = self.game.board
+        for row in range(self.size):
+            for col in range(self.size):
+                state = (board[row][col], self.cursor_pos == (row, col))
+                if self.drawn_cells.get((row, col)) != state:
+                    self.drawn_cells[row, col] = state
+                    self.dirty.append(self.draw_cell(row, col, *state))
+
+    def draw_cell(self, row, col, disc, cursor):
+        """Draw one cell with its grid lines, cursor highlight and disc, and return its rect."""
+        cell = self.cell_size
+        rect = pygame.Rect(LABEL_SPACE + col * cell, LABEL_SPACE + row * cell, cell, cell)
+        self.screen.fill(GREEN, rect)
+        pygame.draw.rect(self.screen, BLACK, rect, 1)  # Draw grid lines
+        if cursor:
+            pygame.draw.rect(self.screen, WHITE, rect, 2)
+        if disc == 'X':
+            pygame.draw.circle(self.screen, BLACK, rect.center, cell // 3)
+        elif disc == 'O':
+            pygame.draw.circle(self.screen, WHITE, rect.center, cell // 3)
+        return rect
 
     def draw_move_log(self, settings=None):
-        """Draw the move log on the right side of the screen."""
-        log_rect = pygame.Rect(WINDOW_SIZE, 0, LOG_WIDTH, WINDOW_SIZE)
-        pygame.draw.rect(self.screen, WHITE, log_rect)
-
-        font = pygame.font.SysFont(None, 30)
-        log_title = font.render("Move Log", True, BLACK)
-        self.screen.blit(log_title, (WINDOW_SIZE + 20, 20))
+        """Draw the move log on the right side of the screen, if its text changed since it was drawn."""
+        lines = [("Move Log", (WINDOW_SIZE + 20, 20))]
 
         # Show AI configuration if in AI mode
         if settings:
-            ai1_info = font.render(f"AI1 Depth: {settings['AI1_depth']}, Heuristic: {settings['AI1_heuristic']}", True,
-                                   BLACK)
-            ai2_info = font.render(f"AI2 Depth: {settings['AI2_depth']}, Heuristic: {settings['AI2_heuristic']}", True,
-                                   BLACK)
-            self.screen.blit(ai1_info, (WINDOW_SIZE + 20, 50))
-            self.screen.blit(ai2_info, (WINDOW_SIZE + 20, 80))
+            lines.append((f"AI1 Depth: {settings['AI1_depth']}, Heuristic: {settings['AI1_heuristic']}",
+                          (WINDOW_SIZE + 20, 50)))
+            lines.append((f"AI2 Depth: {settings['AI2_depth']}, Heuristic: {settings['AI2_heuristic']}",
+                          (WINDOW_SIZE + 20, 80)))
+            if settings.get("time_limit_ms"):
+                lines.append((f"Time per move: {settings['time_limit_ms']} ms", (WINDOW_SIZE + 20, 110)))
 
         # Display moves
-        for i, move in enumerate(self.move_log[-15:], start=1):  # Show the last 15 moves
-            move_text = font.render(f"{i}. {move}", True, BLACK)
-            self.screen.blit(move_text, (WINDOW_SIZE + 20, 110 + i * 30))
+        for i, move in enumerate(self.move_log[-LOG_MOVES:], start=1):
+            lines.append((f"{i}. {move}", (WINDOW_SIZE + 20, 110 + i * 30)))
+
+        if lines == self.drawn_panel:
+            return
+        self.drawn_panel = lines
+        log_rect = pygame.Rect(WINDOW_SIZE, 0, LOG_WIDTH, WINDOW_SIZE - STATUS_HEIGHT)
+        pygame.draw.rect(self.screen, WHITE, log_rect)
+        for text, position in lines:
+            self.screen.blit(self.font.render(text, True, BLACK), position)
+        self.dirty.append(log_rect)
+
+    def draw_search_status(self):
+        """Draw the running search's depth, node rate and best move below the move log, if changed."""
+        lines = self.search.status() if self.search is not None else []
+        if lines == self.drawn_status:
+            return
+        self.drawn_status = lines
+        status_rect = pygame.Rect(WINDOW_SIZE, WINDOW_SIZE - STATUS_HEIGHT, LOG_WIDTH, STATUS_HEIGHT)
+        pygame.draw.rect(self.screen, WHITE, status_rect)
+        for i, text in enumerate(lines):
+            self.screen.blit(self.font.render(text, True, BLACK), (WINDOW_SIZE + 20, status_rect.y + 10 + i * 30))
+        self.dirty.append(status_rect)
+
+    def render(self, settings=None):
+        """Bring the screen up to date, pushing only the changed areas to the display, and
+        wait for the next frame.
+        """
+        self.update_board_cells()
+        self.draw_move_log(settings)
+        self.draw_search_status()
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+        self.clock.tick(FPS)
 
     def update_move_log(self, player, move):
         """Update the move log with the latest move."""
@@ -85,7 +197,7 @@ class VisualOthelloScreen:
         self.move_log.append(f"{player}: {row + 1}{chr(col + ord('a'))}")
 
     def display_winner(self):
-        """Display the winner on the screen."""
+        """Display the winner on the screen for a few seconds, still handling window events."""
         black, white = self.game.count_discs()
         font = pygame.font.SysFont(None, 60)
         if black > white:
@@ -96,57 +208,62 @@ class VisualOthelloScreen:
             text = font.render("It's a draw!", True, BLACK)
         self.screen.blit(text, (WINDOW_SIZE // 4, WINDOW_SIZE // 2 - 30))
         pygame.display.flip()
-        time.sleep(3)
-
-    def get_human_move(self):
-        """Allow the human to move using arrow keys and confirm with Enter."""
-        valid_moves = self.game.valid_moves(self.game.current_player)
-        if not valid_moves:
-            return None
-
-        while True:
+        end = pygame.time.get_ticks() + WINNER_DISPLAY_MS
+        while pygame.time.get_ticks() < end:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    row, col = self.cursor_pos
-                    if event.key == pygame.K_UP:
-                        row = (row - 1) % GRID_SIZE
-                    elif event.key == pygame.K_DOWN:
-                        row = (row + 1) % GRID_SIZE
-                    elif event.key == pygame.K_LEFT:
-                        col = (col - 1) % GRID_SIZE
-                    elif event.key == pygame.K_RIGHT:
-                        col = (col + 1) % GRID_SIZE
-                    elif event.key == pygame.K_RETURN:
-                        if self.cursor_pos in valid_moves:
-                            return self.cursor_pos
-
-                    self.cursor_pos = (row, col)
-                    self.draw_board()
-                    self.draw_move_log()
-                    pygame.display.flip()
-
-    def update_board(self, move, player):
-        """Update the board and move log."""
+                    return
+            self.clock.tick(FPS)
+
+    def handle_key(self, event):
+        """Move the cursor with the arrow keys; return the cursor's square if Enter confirms a valid move."""
+        row, col = self.cursor_pos
+        if event.key == pygame.K_UP:
+            row = (row - 1) % self.size
+        elif event.key == pygame.K_DOWN:
+            row = (row + 1) % self.size
+        elif event.key == pygame.K_LEFT:
+            col = (col - 1) % self.size
+        elif event.key == pygame.K_RIGHT:
+            col = (col + 1) % self.size
+        elif event.key == pygame.K_RETURN:
+            if self.cursor_pos in self.game.valid_moves(self.game.current_player):
+                return self.cursor_pos
+        self.cursor_pos = (row, col)
+        return None
+
+    def update_board(self, move, player, stats=None):
+        """Play the move (None to pass) and update the move log and game record."""
+        self.record.add(move, stats)
         if move:
             self.game.make_move(move[0], move[1], player)
             self.update_move_log(player, move)
-        self.draw_board()
-        self.draw_move_log()
-        pygame.display.flip()
+
+    def save_record(self, mode, ai_player1, ai_player2):
+        """Append the finished game to the record file, if there is one."""
+        if not self.record_path:
+            return
+        if self.size != 8:
+            print("Not recording the game: game records are 8x8 only")
+            return
+        black = f"d{ai_player1.depth}h{ai_player1.heuristic}" if mode == "ai_vs_ai" else "human"
+        white = "human" if mode == "human_vs_human" else f"d{ai_player2.depth}h{ai_player2.heuristic}"
+        self.record.info = {"black": black, "white": white}
+        self.record.finish(self.game)
+        with RecordWriter(self.record_path) as writer:
+            writer.write(self.record)
 
     def configure_ai_settings(self):
         """Allow the user to configure AI settings for AI vs AI mode."""
         font = pygame.font.SysFont(None, 40)
-        settings = {"AI1_depth": 3, "AI1_heuristic": 1, "AI2_depth": 3, "AI2_heuristic": 2}
+        settings = {"AI1_depth": 3, "AI1_heuristic": 1, "AI2_depth": 3, "AI2_heuristic": 2, "time_limit_ms": 0}
         selected_option = 0
         options = [
             "AI 1 Depth: {}",
-            "AI 1 Heuristic: {} (1: h1, 2: h2, 3: h3)",
+            "AI 1 Heuristic: {} (1-5: h1-h5)",
             "AI 2 Depth: {}",
-            "AI 2 Heuristic: {} (1: h1, 2: h2, 3: h3)",
+            "AI 2 Heuristic: {} (1-5: h1-h5)",
+            "Time per Move: {} ms (0: fixed depth)",
             "Start Game"
         ]
 
@@ -157,11 +274,13 @@ class VisualOthelloScreen:
                 value = settings["AI1_depth"] if i == 0 else (
                     settings["AI1_heuristic"] if i == 1 else (
                         settings["AI2_depth"] if i == 2 else (
-                            settings["AI2_heuristic"] if i == 3 else "")))
+                            settings["AI2_heuristic"] if i == 3 else (
+                            settings["time_limit_ms"] if i == 4 else ""))))
                 rendered_text = font.render(option.format(value), True, text_color)
                 self.screen.blit(rendered_text, (WINDOW_SIZE // 4, 100 + i * 60))
 
             pygame.display.flip()
+            self.clock.tick(FPS)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
@@ -177,51 +296,85 @@ class VisualOthelloScreen:
                             settings[key] = max(1, min(10, settings[key] + (1 if event.key == pygame.K_RIGHT else -1)))
                         elif selected_option in [1, 3]:  # Heuristic settings
                             key = "AI1_heuristic" if selected_option == 1 else "AI2_heuristic"
-                            settings[key] = max(1, min(3, settings[key] + (1 if event.key == pygame.K_RIGHT else -1)))
-                    elif event.key == pygame.K_RETURN and selected_option == 4:
+                            top = 5 if self.size == 8 else 4  # Heuristic 5's patterns are 8x8 only
+                            settings[key] = max(1, min(top, settings[key] + (1 if event.key == pygame.K_RIGHT else -1)))
+                        elif selected_option == 4:  # Time budget, in 250 ms steps
+                            step = 250 if event.key == pygame.K_RIGHT else -250
+                            settings["time_limit_ms"] = max(0, min(10000, settings["time_limit_ms"] + step))
+                    elif event.key == pygame.K_RETURN and selected_option == 5:
                         return settings
 
     def run_game(self, mode, settings=None):
-        """Run the Othello game."""
+        """Run the Othello game.
+
+        One loop handles events and redraws at FPS throughout; AI moves are searched in a
+        SearchThread and played once it finishes, at most one move per MOVE_DELAY_MS.
+        Closing the window or pressing Escape cancels any search and ends the game.
+        """
+        time_limit_ms = settings.get("time_limit_ms") if settings else None
         if settings and mode == "ai_vs_ai":
-            ai_player1 = AIPlayer(depth=settings["AI1_depth"], heuristic=settings["AI1_heuristic"])
-            ai_player2 = AIPlayer(depth=settings["AI2_depth"], heuristic=settings["AI2_heuristic"])
+            ai_player1 = AIPlayer(depth=settings["AI1_depth"], heuristic=settings["AI1_heuristic"],
+                                  time_limit_ms=time_limit_ms, stats=self.show_stats)
+            ai_player2 = AIPlayer(depth=settings["AI2_depth"], heuristic=settings["AI2_heuristic"],
+                                  time_limit_ms=time_limit_ms, stats=self.show_stats)
         else:
-            ai_player1 = AIPlayer(depth=3, heuristic=1)
-            ai_player2 = AIPlayer(depth=3, heuristic=2)
+            ai_player1 = AIPlayer(depth=3, heuristic=1, time_limit_ms=time_limit_ms, stats=self.show_stats)
+            ai_player2 = AIPlayer(depth=3, heuristic=2, time_limit_ms=time_limit_ms, stats=self.show_stats)
+        players = {  # The AI playing each colour; None for a human
+            "human_vs_human": {'X': None, 'O': None},
+            "human_vs_ai": {'X': None, 'O': ai_player2},
+            "ai_vs_ai": {'X': ai_player1, 'O': ai_player2},
+        }[mode]
 
+        self.draw_board()
+        next_move_at = pygame.time.get_ticks() + MOVE_DELAY_MS
+        pondering = False
         while not self.game.is_game_over():
-            self.draw_board()
-            self.draw_move_log(settings)
-            pygame.display.flip()
-            time.sleep(0.5)  # Delay to visualize moves
-
-            if mode == "human_vs_human":
-                move = self.get_human_move()
-            elif mode == "human_vs_ai":
-                if self.game.current_player == 'X':
-                    move = self.get_human_move()
-                else:
-                    print("AI is thinking...")
-                    _, move = ai_player2.minimax(self.game, ai_player2.depth, -float('inf'), float('inf'), True, 'O')
-                    print(f"AI chose move: {move}")
-            elif mode == "ai_vs_ai":
-                if self.game.current_player == 'X':
-                    print("AI Player 1 is thinking...")
-                    _, move = ai_player1.minimax(self.game, ai_player1.depth, -float('inf'), float('inf'), True, 'X')
-                    print(f"AI Player 1 chose move: {move}")
-                else:
-                    print("AI Player 2 is thinking...")
-                    _, move = ai_player2.minimax(self.game, ai_player2.depth, -float('inf'), float('inf'), True, 'O')
-                    print(f"AI Player 2 chose move: {move}")
+            player = self.game.current_player
+            ai_player = players[player]
+            human_move = None
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    if self.search is not None:
+                        self.search.cancel()
+                    ai_player1.close()
+                    ai_player2.close()
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN and ai_player is None:
+                    human_move = self.handle_key(event)
+
+            played, move, stats = False, None, None
+            if not self.game.move_mask(player):  # Forced pass
+                played = pygame.time.get_ticks() >= next_move_at
+            elif ai_player is None:
+                if self.ponder and mode == "human_vs_ai" and not pondering:
+                    ai_player2.ponder(self.game, 'O')
+                    pondering = True
+                played, move = human_move is not None, human_move
             else:
-                move = None
-
-            self.update_board(move, self.game.current_player)
-            self.game.current_player = 'O' if self.game.current_player == 'X' else 'X'
-
-        self.draw_board()
-        self.draw_move_log(settings)
+                if self.search is None:
+                    self.search = SearchThread(ai_player, self.game, player)
+                if self.search.done() and pygame.time.get_ticks() >= next_move_at:
+                    move, stats = self.search.outcome()
+                    self.search = None
+                    played = True
+                    name = "AI" if mode == "human_vs_ai" else f"AI Player {1 if player == 'X' else 2}"
+                    print(f"{name} chose move: {move}")
+                    if ai_player.last_stats:
+                        print(f"Search: {ai_player.last_stats.summary()}")
+
+            if played:
+                self.update_board(move, player, stats)
+                self.game.current_player = 'O' if player == 'X' else 'X'
+                next_move_at = pygame.time.get_ticks() + MOVE_DELAY_MS
+                pondering = False
+            self.render(settings)
+        ai_player1.close()
+        ai_player2.close()
+        self.save_record(mode, ai_player1, ai_player2)
+
+        self.render(settings)
         self.display_winner()
 
     def main_menu(self):
@@ -238,6 +391,7 @@ class VisualOthelloScreen:
                 self.screen.blit(text, (WINDOW_SIZE // 4, 150 + i * 80))
 
             pygame.display.flip()
+            self.clock.tick(FPS)
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -260,6 +414,18 @@ class VisualOthelloScreen:
                         return
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Play Othello in a window.")
+    parser.add_argument("--size", type=int, default=8, choices=range(4, 27, 2), metavar="SIZE",
+                        help="Board size, an even number from 4 to 26")
+    parser.add_argument("--record", help="Game record file to append finished games to (see GameRecord.py)")
+    parser.add_argument("--ponder", action="store_true",
+                        help="Let the AI search the expected reply while the human thinks")
+    parser.add_argument("--stats", action="store_true", help="Print search statistics after every AI move")
+    args = parser.parse_args()
+    visual_othello = VisualOthelloScreen(args.size, args.record, args.ponder, args.stats)
+    visual_othello.main_menu()
+
+
 if __name__ == "__main__":
-    visual_othello = VisualOthelloScreen()
-    visual_othello.main_menu()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,5 +1,7 @@
 from Othello import Othello
 from AIplayer import AIPlayer
+from GameRecord import GameRecord, RecordWriter, move_stats
+import argparse
 import time
 
 
@@ -25,15 +27,43 @@ def get_human_move(game, player):
             print("Invalid input format. Please enter as 'row col' (e.g., 4 d).")
 
 
-def human_vs_human():
+def log_search_stats(ai_player):
+    """Print the statistics of the AI's last search, if it collected any."""
+    if ai_player.last_stats:
+        print(f"Search: {ai_player.last_stats.summary()}")
+
+
+def ai_move(ai_player, game, player, record):
+    """Let the AI choose a move and note it, with its search stats, in the game record."""
+    start = time.perf_counter()
+    score, move = ai_player.get_move(game, player)
+    record.add(move, move_stats(ai_player, score, time.perf_counter() - start))
+    log_search_stats(ai_player)
+    return move
+
+
+def save_record(record, game, info, path):
+    """Append the finished game to the record file `path`, if given."""
+    if path and game.size != 8:
+        print("Not recording the game: game records are 8x8 only")
+    elif path:
+        record.info = info
+        record.finish(game)
+        with RecordWriter(path) as writer:
+            writer.write(record)
+
+
+def human_vs_human(size=8, record_path=None):
     """Start a human vs. human game."""
-    game = Othello()
+    game, record = Othello(size), GameRecord()
     while not game.is_game_over():
         game.print_board()
         move = get_human_move(game, game.current_player)
+        record.add(move)
         if move:
             game.make_move(*move, game.current_player)
         game.current_player = 'O' if game.current_player == 'X' else 'X'
+    save_record(record, game, {"black": "human", "white": "human"}, record_path)
 
     game.print_board()
     black, white = game.count_discs()
@@ -41,22 +71,27 @@ def human_vs_human():
     print("Winner:", "Black" if black > white else "White" if white > black else "Draw")
 
 
-def human_vs_ai():
-    """Start a human vs. AI game."""
-    game = Othello()
-    ai_player = AIPlayer(depth=3, heuristic=1)
+def human_vs_ai(size=8, record_path=None, ponder=False, show_stats=False):
+    """Start a human vs. AI game; with `ponder` the AI searches on the human's time."""
+    game, record = Othello(size), GameRecord()
+    ai_player = AIPlayer(depth=3, heuristic=1, stats=show_stats)
     while not game.is_game_over():
         game.print_board()
         if game.current_player == 'X':
+            if ponder:
+                ai_player.ponder(game, 'O')
             move = get_human_move(game, 'X')
+            record.add(move)
         else:
             print(f"AI ('O') is thinking...")
             time.sleep(0.5)  # Add delay for AI's move
-            _, move = ai_player.minimax(game, ai_player.depth, -float('inf'), float('inf'), True, 'O')
+            move = ai_move(ai_player, game, 'O', record)
 
         if move:
             game.make_move(*move, game.current_player)
         game.current_player = 'O' if game.current_player == 'X' else 'X'
+    ai_player.close()
+    save_record(record, game, {"black": "human", "white": "d3h1"}, record_path)
 
     game.print_board()
     black, white = game.count_discs()
@@ -64,31 +99,50 @@ def human_vs_ai():
     print("Winner:", "Black" if black > white else "White" if white > black else "Draw")
 
 
-def ai_vs_ai():
+def choose_heuristic(label, size):
+    """Prompt for an AI's heuristic, offering the pattern heuristic only on 8x8 boards."""
+    choices = "1: h1, 2: h2, 3: h3, 4: h4, 5: patterns" if size == 8 else "1: h1, 2: h2, 3: h3, 4: h4"
+    top = 5 if size == 8 else 4
+    while True:
+        try:
+            heuristic = int(input(f"Choose heuristic for {label} ({choices}): "))
+            if 1 <= heuristic <= top:
+                return heuristic
+        except ValueError:
+            pass
+        print(f"Please enter a number from 1 to {top}.")
+
+
+def ai_vs_ai(size=8, record_path=None, show_stats=False):
     """Start an AI vs. AI game with configurable settings."""
-    game = Othello()
+    game, record = Othello(size), GameRecord()
 
     # Configure AI players
     depth1 = int(input("Enter depth for AI Player 1 (X): "))
-    heuristic1 = int(input("Choose heuristic for AI Player 1 (1: h1, 2: h2, 3: h3): "))
-    ai_player1 = AIPlayer(depth=depth1, heuristic=heuristic1)
+    heuristic1 = choose_heuristic("AI Player 1", size)
+    time_limit1 = int(input("Time per move in ms for AI Player 1 (0 for fixed depth): ") or 0)
+    ai_player1 = AIPlayer(depth=depth1, heuristic=heuristic1, time_limit_ms=time_limit1,
+                          stats=show_stats)
 
     depth2 = int(input("Enter depth for AI Player 2 (O): "))
-    heuristic2 = int(input("Choose heuristic for AI Player 2 (1: h1, 2: h2, 3: h3): "))
-    ai_player2 = AIPlayer(depth=depth2, heuristic=heuristic2)
+    heuristic2 = choose_heuristic("AI Player 2", size)
+    time_limit2 = int(input("Time per move in ms for AI Player 2 (0 for fixed depth): ") or 0)
+    ai_player2 = AIPlayer(depth=depth2, heuristic=heuristic2, time_limit_ms=time_limit2,
+                          stats=show_stats)
 
     while not game.is_game_over():
         game.print_board()
         if game.current_player == 'X':
             print(f"AI Player 1 ('X') is thinking...")
-            _, move = ai_player1.minimax(game, ai_player1.depth, -float('inf'), float('inf'), True, 'X')
+            move = ai_move(ai_player1, game, 'X', record)
         else:
             print(f"AI Player 2 ('O') is thinking...")
-            _, move = ai_player2.minimax(game, ai_player2.depth, -float('inf'), float('inf'), True, 'O')
+            move = ai_move(ai_player2, game, 'O', record)
 
         if move:
             game.make_move(*move, game.current_player)
         game.current_player = 'O' if game.current_player == 'X' else 'X'
+    save_record(record, game, {"black": f"d{depth1}h{heuristic1}", "white": f"d{depth2}h{heuristic2}"}, record_path)
 
     game.print_board()
     black, white = game.count_discs()
@@ -97,6 +151,15 @@ def ai_vs_ai():
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Play Othello in the terminal.")
+    parser.add_argument("--size", type=int, default=8, choices=range(4, 27, 2), metavar="SIZE",
+                        help="Board size, an even number from 4 to 26")
+    parser.add_argument("--record", help="Game record file to append finished games to (see GameRecord.py)")
+    parser.add_argument("--ponder", action="store_true",
+                        help="Let the AI search the expected reply while the human thinks")
+    parser.add_argument("--stats", action="store_true", help="Print search statistics after every AI move")
+    args = parser.parse_args()
+
     print("Welcome to Othello!")
     print("1. Human vs. Human")
     print("2. Human vs. AI")
@@ -104,11 +167,11 @@ def main():
     choice = input("Choose game mode (1/2/3): ").strip()
 
     if choice == '1':
-        human_vs_human()
+        human_vs_human(args.size, args.record)
     elif choice == '2':
-        human_vs_ai()
+        human_vs_ai(args.size, args.record, args.ponder, args.stats)
     elif choice == '3':
-        ai_vs_ai()
+        ai_vs_ai(args.size, args.record, args.stats)
     else:
         print("Invalid choice. Exiting game.")
 